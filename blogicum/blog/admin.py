@@ -1,14 +1,22 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import Group
+from django.db import models
 
-from .models import Category, Comment, Location, Post, User
+from .forms import BasePostForm, PostImageField
+from .models import Category, Comment, ImageJob, Location, Post, User
 
 admin.site.empty_value_display = 'Не задано'
 
 admin.site.unregister(User)
 admin.site.unregister(Group)
 
+# Та же проверка размера, что и на сайте: обрезанный обработчиком
+# загрузки файл не должен попасть в хранилище.
+IMAGE_FORMFIELD_OVERRIDES = {
+    models.ImageField: {'form_class': PostImageField},
+}
+
 
 @admin.register(User)
 class AdminUser(BaseUserAdmin):
@@ -28,7 +36,9 @@ class AdminUser(BaseUserAdmin):
 
 class PostInline(admin.StackedInline):
     model = Post
+    form = BasePostForm
     extra = 0
+    formfield_overrides = IMAGE_FORMFIELD_OVERRIDES
 
 
 @admin.register(Category)
@@ -61,6 +71,13 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('category',)
     list_display_links = ('title', 'author',)
     readonly_fields = ['image_tag']
+    formfield_overrides = IMAGE_FORMFIELD_OVERRIDES
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            obj.save_edits()
+        else:
+            super().save_model(request, obj, form, change)
 
 
 @admin.register(Comment)
@@ -73,4 +90,17 @@ class CommentAdmin(admin.ModelAdmin):
     list_display_links = ('author',)
 
 
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'image',
+        'post',
+        'status',
+        'attempts',
+        'updated_at',
+    )
+    list_filter = ('status',)
+    readonly_fields = ('last_error',)
+
+
 admin.site.register(Location)
@@ -0,0 +1,86 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .const import REPLICA_PIN_SECONDS
+
+GENERATION_KEY = 'blog:generation:{}'
+RECENT_WRITE_KEY = 'blog:recent-write'
+STATS_KEY = 'blog:stats:{}:{}'
+# Кэши со счётчиками попаданий: страницы для анонимов и карточки постов.
+STATS_NAMES = ('page', 'card')
+
+
+def _initial_generation():
+    # Если счётчик вытеснен из кэша, новое значение не должно совпасть
+    # с поколением уже закэшированных страниц.
+    return int(time.time() * 1000)
+
+
+def get_generation(name='feed'):
+    key = GENERATION_KEY.format(name)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _initial_generation(), None)
+        generation = cache.get(key, _initial_generation())
+    return generation
+
+
+def bump_generation(name='feed'):
+    # Пока реплики догоняют запись, страница или карточка нового
+    # поколения, прочитанная из реплики, закэшировалась бы устаревшей.
+    cache.set(
+        RECENT_WRITE_KEY, True,
+        getattr(settings, 'REPLICA_PIN_SECONDS', REPLICA_PIN_SECONDS),
+    )
+    key = GENERATION_KEY.format(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, _initial_generation(), None)
+        return cache.get(key)
+
+
+def has_recent_write():
+    """Данные менялись за последние REPLICA_PIN_SECONDS секунд."""
+    return cache.get(RECENT_WRITE_KEY, False)
+
+
+def make_key(prefix, generation_value, *parts):
+    """Ключ для уже прочитанного значения поколения.
+
+    Позволяет прочитать поколение один раз на много ключей.
+    """
+    digest = hashlib.md5(
+        '\x1f'.join(str(part) for part in parts).encode()
+    ).hexdigest()
+    return f'blog:{prefix}:{generation_value}:{digest}'
+
+
+def versioned_key(prefix, *parts, generation='feed'):
+    return make_key(prefix, get_generation(generation), *parts)
+
+
+def record(name, event, count=1):
+    if not count:
+        return
+    key = STATS_KEY.format(name, event)
+    try:
+        cache.incr(key, count)
+    except ValueError:
+        if not cache.add(key, count, None):
+            cache.incr(key, count)
+
+
+def get_stats(name):
+    hits = cache.get(STATS_KEY.format(name, 'hit'), 0)
+    misses = cache.get(STATS_KEY.format(name, 'miss'), 0)
+    return {'hits': hits, 'misses': misses}
+
+
+def reset_stats(name):
+    cache.delete_many(
+        [STATS_KEY.format(name, 'hit'), STATS_KEY.format(name, 'miss')]
+    )
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """manage.py check --deploy: кэш блога должен быть общим."""
+    if settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        'Кэш по умолчанию хранится в памяти процесса.',
+        hint=(
+            'Поколения ленты и карточек не сбрасываются в других '
+            'процессах сервера: задайте CACHE_URL с memcached или redis.'
+        ),
+        id='blog.W001',
+    )]
@@ -1,3 +1,26 @@
 MAX_LENGTH_FIELD = 256
 STR_LENGTH = 21
 PAGINATOR_LENGTH = 10
+PUBLICATION_CUTOFF_GRANULARITY = 60
+FEED_PAGINATION = 'offset'
+PAGE_CACHE_TIMEOUT = 300
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+EXCERPT_WORDS = 10
+IMAGE_WORKERS = {
+    # thread, process или sync (обработка прямо в запросе).
+    'BACKEND': 'thread',
+    'WORKERS': 2,
+    'MAX_ATTEMPTS': 3,
+    # Пауза в секундах перед первым повтором, дальше она удваивается.
+    'RETRY_DELAY': 30,
+    # Через сколько секунд задача в статусе running считается брошенной
+    # упавшим процессом и возвращается в очередь.
+    'STALE_AFTER': 15 * 60,
+}
+MEDIA_CACHE_MAX_AGE = 60 * 60
+IMAGE_UPLOAD_MAX_SIZE = 20 * 1024 * 1024
+IMAGE_MAX_PIXELS = 40_000_000
+REPLICA_PIN_COOKIE = 'pin_primary'
+# Сколько секунд после изменения данных клиент, который их изменил, а
+# после изменения ленты — все клиенты читают основную базу.
+REPLICA_PIN_SECONDS = 10
@@ -1,7 +1,11 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.template.defaultfilters import filesizeformat
 from django.utils.timezone import now, localtime
 from django.contrib.auth.forms import UserCreationForm
 from django import forms
 
+from .const import IMAGE_MAX_PIXELS, IMAGE_UPLOAD_MAX_SIZE
 from .models import Post, Comment, User
 
 
@@ -11,7 +15,53 @@ class CustomUserCreationForm(UserCreationForm):
         model = User
 
 
-class PostForm(forms.ModelForm):
+class PostImageField(forms.ImageField):
+    """Проверяет размер файла до Pillow, а размеры — по заголовку."""
+
+    default_error_messages = {
+        'too_large': 'Размер файла не должен превышать %(limit)s.',
+        'too_many_pixels': (
+            'Изображение слишком большое: не более %(limit)s пикселей.'
+        ),
+    }
+
+    def to_python(self, data):
+        limit = getattr(
+            settings, 'IMAGE_UPLOAD_MAX_SIZE', IMAGE_UPLOAD_MAX_SIZE
+        )
+        if data and (getattr(data, 'oversized', False) or data.size > limit):
+            raise ValidationError(
+                self.error_messages['too_large'],
+                code='too_large',
+                params={'limit': filesizeformat(limit)},
+            )
+        file = super().to_python(data)
+        if file is None:
+            return None
+        # Image.open читает только заголовок: пиксели ещё не распакованы.
+        max_pixels = getattr(settings, 'IMAGE_MAX_PIXELS', IMAGE_MAX_PIXELS)
+        if file.image.width * file.image.height > max_pixels:
+            raise ValidationError(
+                self.error_messages['too_many_pixels'],
+                code='too_many_pixels',
+                params={'limit': max_pixels},
+            )
+        return file
+
+
+class BasePostForm(forms.ModelForm):
+    """Сохраняет правку поста через Post.save_edits()."""
+
+    def save(self, commit=True):
+        if not commit or self.instance._state.adding:
+            return super().save(commit)
+        post = super().save(commit=False)
+        post.save_edits()
+        self.save_m2m()
+        return post
+
+
+class PostForm(BasePostForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields['pub_date'].initial = localtime(
@@ -21,6 +71,7 @@ class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         exclude = ('author',)
+        field_classes = {'image': PostImageField}
         widgets = {
             'pub_date': forms.DateTimeInput
             (attrs={
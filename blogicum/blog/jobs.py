@@ -0,0 +1,193 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+
+import django
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .cache import bump_generation
+from .const import IMAGE_WORKERS
+from .models import ImageJob, Post
+from .renditions import generate_renditions
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _reset_executor():
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+# Сервер с предварительной загрузкой (gunicorn --preload) создаёт пул в
+# главном процессе, а потоки пула форк не переживают: процесс-потомок
+# заводит свой пул.
+os.register_at_fork(after_in_child=_reset_executor)
+
+
+def get_worker_settings():
+    return {**IMAGE_WORKERS, **getattr(settings, 'IMAGE_WORKERS', {})}
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            options = get_worker_settings()
+            if options['BACKEND'] == 'process':
+                # spawn, а не fork: дочерний процесс не должен наследовать
+                # открытые соединения с базой данных.
+                _executor = ProcessPoolExecutor(
+                    max_workers=options['WORKERS'],
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=django.setup,
+                )
+            else:
+                _executor = ThreadPoolExecutor(
+                    max_workers=options['WORKERS'],
+                    thread_name_prefix='image-worker',
+                )
+        return _executor
+
+
+def submit(job_id):
+    if get_worker_settings()['BACKEND'] == 'sync':
+        process_job(job_id)
+    else:
+        get_executor().submit(run_in_worker, job_id)
+
+
+def retry_delay(attempts):
+    """Пауза перед повтором: RETRY_DELAY, затем вдвое больше каждый раз."""
+    return get_worker_settings()['RETRY_DELAY'] * 2 ** (attempts - 1)
+
+
+def submit_later(job_id, delay):
+    if get_worker_settings()['BACKEND'] == 'sync':
+        time.sleep(delay)
+        process_job(job_id)
+        return
+    # Задача остаётся pending: если процесс завершится раньше таймера,
+    # её отправит drain_queue() после перезапуска.
+    timer = threading.Timer(delay, submit, (job_id,))
+    timer.daemon = True
+    timer.start()
+
+
+def run_in_worker(job_id):
+    close_old_connections()
+    try:
+        process_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def enqueue(post):
+    """Ставит обработку изображения поста в очередь после коммита."""
+    job, created = ImageJob.objects.get_or_create(
+        post=post, defaults={'image': post.image.name}
+    )
+    if not created:
+        if job.image == post.image.name and job.status in (
+            ImageJob.PENDING, ImageJob.RUNNING
+        ):
+            return job
+        job.image = post.image.name
+        job.status = ImageJob.PENDING
+        job.attempts = 0
+        job.last_error = ''
+        job.save()
+    transaction.on_commit(partial(submit, job.pk))
+    return job
+
+
+def process_job(job_id, resubmit=True):
+    # update() не трогает auto_now, а по updated_at ищутся брошенные
+    # задачи.
+    claimed = ImageJob.objects.filter(
+        pk=job_id, status=ImageJob.PENDING
+    ).update(
+        status=ImageJob.RUNNING,
+        attempts=F('attempts') + 1,
+        updated_at=timezone.now(),
+    )
+    if not claimed:
+        return
+    job = ImageJob.objects.select_related('post').get(pk=job_id)
+    if job.post.image.name != job.image:
+        # Изображение заменили, пока задача ждала в очереди.
+        job.status = ImageJob.DONE
+        job.save(update_fields=('status', 'updated_at'))
+        return
+    try:
+        generate_renditions(job.post.image)
+    except Exception as error:
+        logger.exception('Ошибка обработки изображения %s', job.image)
+        retry = job.attempts < get_worker_settings()['MAX_ATTEMPTS']
+        job.status = ImageJob.PENDING if retry else ImageJob.FAILED
+        job.last_error = f'{type(error).__name__}: {error}'
+        job.save(update_fields=('status', 'last_error', 'updated_at'))
+        if retry and resubmit:
+            submit_later(job.pk, retry_delay(job.attempts))
+        return
+    job.status = ImageJob.DONE
+    job.last_error = ''
+    job.save(update_fields=('status', 'last_error', 'updated_at'))
+    # Ключ карточки содержит updated_at поста: новое значение заменит
+    # карточку с исходным изображением на карточку с уменьшенной копией.
+    # Страницы и ETag сбрасывает поколение ленты.
+    Post.objects.filter(pk=job.post_id).update(updated_at=timezone.now())
+    bump_generation()
+
+
+def reclaim_stale_jobs():
+    """Возвращает в очередь задачи, брошенные упавшим процессом.
+
+    Задача, исчерпавшая попытки, помечается ошибкой. Возвращает число
+    возвращённых в очередь задач.
+    """
+    options = get_worker_settings()
+    stale = ImageJob.objects.filter(
+        status=ImageJob.RUNNING,
+        updated_at__lt=timezone.now() - timedelta(
+            seconds=options['STALE_AFTER']
+        ),
+    )
+    stale.filter(attempts__gte=options['MAX_ATTEMPTS']).update(
+        status=ImageJob.FAILED,
+        last_error='Процесс обработки прервался.',
+        updated_at=timezone.now(),
+    )
+    return stale.update(status=ImageJob.PENDING, updated_at=timezone.now())
+
+
+def drain_queue():
+    """Отправляет в пул задачи, оставшиеся в очереди после перезапуска.
+
+    Вызывается при старте сервера из wsgi.py и asgi.py. Задачу забирает
+    тот процесс, который первым переведёт её в running, поэтому
+    несколько процессов сервера могут вызывать её одновременно.
+    """
+    try:
+        reclaim_stale_jobs()
+        pending = list(ImageJob.objects.filter(
+            status=ImageJob.PENDING
+        ).values_list('pk', flat=True))
+    except DatabaseError as error:
+        # Например, миграции ещё не применены.
+        logger.warning('Очередь изображений не прочитана: %s', error)
+        return 0
+    for job_id in pending:
+        submit(job_id)
+    return len(pending)
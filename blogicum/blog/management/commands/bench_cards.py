@@ -0,0 +1,117 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.template import Context, engines
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.models import Category, Post
+
+# Прежний путь: {% include %} в цикле, {% url %} и вложенный
+# category_link.html в каждой карточке.
+LEGACY_URLS = {
+    '{{ profile_url }}': "{% url 'blog:profile' post.author.username %}",
+    '{{ detail_url }}': "{% url 'blog:post_detail' post.id %}",
+}
+LEGACY_CATEGORY = (
+    '<a class="text-muted" href="{{ category_url }}">'
+    '{{ post.category.title }}</a>'
+)
+LEGACY_PAGE = (
+    '{% for post in posts %}<article class="mb-5">'
+    '{% include card %}</article>{% endfor %}'
+)
+COMPILED_PAGE = (
+    '{% load blog_tags %}{% prefetch_cards posts %}'
+    '{% for post in posts %}<article class="mb-5">'
+    '{% post_card post %}</article>{% endfor %}'
+)
+# Без кэша: сравнивается именно отрисовка карточек.
+NO_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время отрисовки карточки поста через {% include %} '
+        'и через {% post_card %} на страницах из 10 и 100 постов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[10, 100],
+            help='Число постов на странице.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=50,
+            help='Сколько раз отрисовать каждую страницу.',
+        )
+
+    def handle(self, *args, **options):
+        engine = engines['django'].engine
+        source = engine.get_template('includes/post_card.html').source
+        for variable, tag in LEGACY_URLS.items():
+            source = self.legacy_replace(source, variable, tag)
+        source = self.legacy_replace(
+            source, LEGACY_CATEGORY,
+            '{% include "includes/category_link.html" %}',
+        )
+        card = engine.from_string(source)
+        pages = (
+            ('{% include %}', engine.from_string(LEGACY_PAGE)),
+            ('{% post_card %}', engine.from_string(COMPILED_PAGE)),
+        )
+        with override_settings(CACHES=NO_CACHE):
+            for size in options['sizes']:
+                posts = self.make_posts(size)
+                timings = [
+                    self.measure(
+                        page, posts, card, options['repeat']
+                    ) / size
+                    for _, page in pages
+                ]
+                for (title, _), per_card in zip(pages, timings):
+                    self.stdout.write(
+                        f'{size} постов, {title}: '
+                        f'{per_card * 1e6:.1f} мкс на карточку'
+                    )
+                self.stdout.write(
+                    f'{size} постов: ускорение '
+                    f'{timings[0] / timings[1]:.2f}x'
+                )
+
+    @staticmethod
+    def legacy_replace(source, old, new):
+        # Иначе прежний путь незаметно совпадёт с новым.
+        if old not in source:
+            raise CommandError(
+                f'В includes/post_card.html нет «{old}»: обновите '
+                'LEGACY_URLS и LEGACY_CATEGORY.'
+            )
+        return source.replace(old, new)
+
+    def make_posts(self, count):
+        """Посты в памяти: база в замер не попадает."""
+        author = get_user_model()(username='bench')
+        category = Category(
+            title='Бенчмарк', slug='bench', is_published=True
+        )
+        now = timezone.now()
+        return [
+            Post(
+                pk=number, title=f'Пост {number}', text='Текст ' * 50,
+                pub_date=now, updated_at=now, is_published=True,
+                author=author, category=category,
+            )
+            for number in range(1, count + 1)
+        ]
+
+    def measure(self, page, posts, card, repeat):
+        context = Context({'posts': posts, 'card': card})
+        page.render(context)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            page.render(context)
+        return (time.perf_counter() - started) / repeat
@@ -0,0 +1,140 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.test import Client
+from django.utils import timezone
+
+from blog.models import Category, Post
+from blogicum.database import SQLITE_TUNED_PRAGMAS
+
+# Без PRAGMA и с отложенными транзакциями: журнал отката и таймаут
+# блокировки sqlite3 по умолчанию.
+DEFAULT_MODE = ({}, None)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность ленты и комментариев '
+        'на SQLite с PRAGMA и режимом транзакций из настроек и без них.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int, default=8, help='Число потоков.'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=50, help='Запросов на поток.'
+        )
+        parser.add_argument(
+            '--posts', type=int, default=100, help='Постов в ленте.'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда сравнивает режимы только SQLite.')
+        database = settings.DATABASES['default']
+        original = (
+            database['NAME'],
+            database.get('PRAGMAS', {}),
+            database.get('TRANSACTION_MODE'),
+        )
+        tuned = (SQLITE_TUNED_PRAGMAS, 'IMMEDIATE')
+        # Ошибки блокировок считаются в отчёте, а не печатаются.
+        logging.getLogger('django.request').setLevel(logging.CRITICAL)
+        try:
+            for title, (pragmas, mode) in (
+                ('по умолчанию', DEFAULT_MODE), ('рабочий', tuned)
+            ):
+                with tempfile.TemporaryDirectory() as directory:
+                    self.use_database(
+                        os.path.join(directory, 'bench.sqlite3'),
+                        pragmas,
+                        mode,
+                    )
+                    post = self.seed(options['posts'])
+                    self.report(title, self.run(post, options))
+                    connections.close_all()
+        finally:
+            self.use_database(*original)
+
+    def use_database(self, name, pragmas, transaction_mode):
+        connections.close_all()
+        for settings_dict in (
+            settings.DATABASES['default'], connection.settings_dict
+        ):
+            settings_dict['NAME'] = name
+            settings_dict['PRAGMAS'] = pragmas
+            settings_dict['TRANSACTION_MODE'] = transaction_mode
+
+    def seed(self, count):
+        call_command('migrate', verbosity=0, interactive=False)
+        author = get_user_model().objects.create_user('bench', password='-')
+        category = Category.objects.create(
+            title='Бенчмарк', slug='bench', description='-'
+        )
+        Post.objects.bulk_create(
+            Post(
+                title=f'Пост {number}', text='Текст ' * 50,
+                pub_date=timezone.now(), author=author, category=category,
+            )
+            for number in range(count)
+        )
+        return Post.objects.first()
+
+    def worker(self, post, requests, results):
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(post.author)
+        done = locked = 0
+        try:
+            for number in range(requests):
+                try:
+                    if number % 2:
+                        client.post(
+                            f'/posts/{post.pk}/comment/',
+                            {'text': f'Комментарий {number}'},
+                        )
+                    else:
+                        client.get('/')
+                    done += 1
+                except OperationalError:
+                    locked += 1
+        finally:
+            connections.close_all()
+        results.append((done, locked))
+
+    def run(self, post, options):
+        cache.clear()
+        results = []
+        threads = [
+            threading.Thread(
+                target=self.worker,
+                args=(post, options['requests'], results),
+            )
+            for _ in range(options['threads'])
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        done = sum(result[0] for result in results)
+        locked = sum(result[1] for result in results)
+        return done, locked, elapsed
+
+    def report(self, title, result):
+        done, locked, elapsed = result
+        self.stdout.write(
+            f'{title}: {done / elapsed:.1f} запросов/с, '
+            f'успешно {done}, «database is locked» {locked}, '
+            f'{elapsed:.2f} с'
+        )
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.cache import get_stats, reset_stats
+from blog.checks import PROCESS_LOCAL_CACHES
+
+
+class Command(BaseCommand):
+    help = 'Показывает попадания и промахи кэша страниц и карточек.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить счётчики после вывода.',
+        )
+
+    def handle(self, *args, **options):
+        if settings.CACHES['default']['BACKEND'] in PROCESS_LOCAL_CACHES:
+            self.stderr.write(
+                'Кэш хранится в памяти процесса: команда видит только свои '
+                'счётчики. Счётчики сервера отдаёт /cache-stats/ '
+                '(для сотрудников), или задайте общий CACHE_URL.'
+            )
+        for name, title in (
+            ('page', 'Страницы для анонимов'), ('card', 'Карточки постов')
+        ):
+            stats = get_stats(name)
+            total = stats['hits'] + stats['misses']
+            ratio = stats['hits'] / total if total else 0
+            self.stdout.write(
+                f'{title}: попаданий {stats["hits"]}, '
+                f'промахов {stats["misses"]}, доля попаданий {ratio:.1%}'
+            )
+            if options['reset']:
+                reset_stats(name)
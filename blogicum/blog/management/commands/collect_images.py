@@ -0,0 +1,69 @@
+import posixpath
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.models import Post
+from blog.renditions import rendition_names
+from blog.storage import COLLECTED_SUFFIX
+
+
+class Command(BaseCommand):
+    help = 'Удаляет файлы изображений, на которые не ссылается ни один пост.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать файлы, которые будут удалены.',
+        )
+        parser.add_argument(
+            '--grace',
+            type=int,
+            default=60,
+            help='Не трогать файлы моложе указанного числа минут.',
+        )
+
+    def walk(self, storage, directory):
+        directories, files = storage.listdir(directory)
+        for name in files:
+            # Файл, который сейчас удаляет другой запуск команды.
+            if not name.endswith(COLLECTED_SUFFIX):
+                yield posixpath.join(directory, name)
+        for subdirectory in directories:
+            yield from self.walk(
+                storage, posixpath.join(directory, subdirectory)
+            )
+
+    @staticmethod
+    def is_referenced(name):
+        # Пост мог сохраниться после того, как собран список ссылок.
+        return Post.objects.filter(image=name).exists()
+
+    def handle(self, *args, **options):
+        field = Post._meta.get_field('image')
+        storage = field.storage
+        directory = field.upload_to
+        if not storage.exists(directory):
+            return
+        referenced = set()
+        for name in Post.objects.exclude(image='').values_list(
+            'image', flat=True
+        ).distinct().iterator():
+            referenced.add(name)
+            referenced.update(rendition_names(name))
+        # Свежие файлы могут принадлежать постам, которые ещё не сохранены;
+        # повторная загрузка того же файла обновляет его время изменения.
+        cutoff = timezone.now() - timedelta(minutes=options['grace'])
+        removed = 0
+        for name in self.walk(storage, directory):
+            if name in referenced or storage.get_modified_time(name) > cutoff:
+                continue
+            if options['dry_run']:
+                self.stdout.write(name)
+                removed += 1
+            elif storage.delete_unused(name, cutoff, self.is_referenced):
+                removed += 1
+        verb = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(f'{verb} файлов: {removed}'))
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from blog.jobs import process_job, reclaim_stale_jobs, retry_delay
+from blog.models import ImageJob, Post
+
+
+class Command(BaseCommand):
+    help = 'Обрабатывает очередь изображений постов в текущем процессе.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Поставить в очередь все посты с изображениями.',
+        )
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Вернуть в очередь задачи, завершившиеся ошибкой.',
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            for post in Post.objects.exclude(image='').only('pk', 'image'):
+                ImageJob.objects.update_or_create(
+                    post=post,
+                    defaults={
+                        'image': post.image.name,
+                        'status': ImageJob.PENDING,
+                        'attempts': 0,
+                        'last_error': '',
+                    },
+                )
+        if options['retry_failed']:
+            ImageJob.objects.filter(status=ImageJob.FAILED).update(
+                status=ImageJob.PENDING, attempts=0
+            )
+        reclaim_stale_jobs()
+        pending = ImageJob.objects.filter(status=ImageJob.PENDING)
+        attempt = 0
+        while pending.exists():
+            if attempt:
+                # В очереди остались задачи, завершившиеся ошибкой.
+                time.sleep(retry_delay(attempt))
+            attempt += 1
+            for job_id in list(pending.values_list('pk', flat=True)):
+                process_job(job_id, resubmit=False)
+        for row in ImageJob.objects.values('status').annotate(
+            total=Count('pk')
+        ).order_by('status'):
+            self.stdout.write(f'{row["status"]}: {row["total"]}')
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает Post.comment_count и исправляет расхождения.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать число постов с неверным счётчиком.',
+        )
+
+    def handle(self, *args, **options):
+        counts = Comment.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(
+            total=Count('pk')
+        ).values('total')
+        with transaction.atomic():
+            drifted = Post.objects.annotate(
+                actual=Coalesce(Subquery(counts), 0)
+            ).exclude(comment_count=F('actual'))
+            if options['dry_run']:
+                self.stdout.write(
+                    f'Постов с неверным счётчиком: {drifted.count()}'
+                )
+                return
+            fixed = Post.objects.filter(
+                pk__in=drifted.values('pk')
+            ).update(comment_count=Coalesce(Subquery(counts), 0))
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено счётчиков комментариев: {fixed}'
+        ))
@@ -0,0 +1,152 @@
+import mimetypes
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, StreamingHttpResponse
+)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+
+from .const import MEDIA_CACHE_MAX_AGE
+
+# Оригинал под SHA-256 своего содержимого никогда не меняется — его можно
+# кэшировать навсегда. Копии (<sha>.card.jpg, .webp) названы по хешу
+# оригинала и перезаписываются при process_image_jobs --rebuild, поэтому
+# получают обычный MEDIA_CACHE_MAX_AGE.
+HASHED_NAME = re.compile(r'(^|/)[0-9a-f]{64}(\.[A-Za-z0-9]{1,10})?$')
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def _file_range(path, start, length):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _parse_range(header, size):
+    """(start, end) включительно, None для всего файла или False для 416."""
+    match = RANGE.match(header.replace(' ', ''))
+    if match is None:
+        # Несколько диапазонов и другие единицы: отдаём файл целиком.
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _if_range_matches(request, etag, mtime):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range is None:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(mtime)
+
+
+def _cache_control(path):
+    if HASHED_NAME.search(path):
+        return 'public, max-age=31536000, immutable'
+    max_age = getattr(settings, 'MEDIA_CACHE_MAX_AGE', MEDIA_CACHE_MAX_AGE)
+    return f'public, max-age={max_age}'
+
+
+def _sendfile(path, full_path):
+    mode = getattr(settings, 'MEDIA_SENDFILE', None)
+    if mode == 'x-sendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = str(full_path)
+        return response
+    if mode == 'x-accel-redirect':
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = (
+            settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(path)
+        )
+        return response
+    return None
+
+
+def _file_response(request, path, full_path, stat, etag):
+    content_type, encoding = mimetypes.guess_type(str(full_path))
+    content_type = content_type or 'application/octet-stream'
+    response = _sendfile(path, full_path)
+    if response is not None:
+        response['Content-Type'] = content_type
+        return response
+    byte_range = None
+    if 'HTTP_RANGE' in request.META and (
+        _if_range_matches(request, etag, stat.st_mtime)
+    ):
+        byte_range = _parse_range(request.META['HTTP_RANGE'], stat.st_size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+    if byte_range is not None:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _file_range(full_path, start, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = end - start + 1
+    else:
+        response = FileResponse(
+            open(full_path, 'rb'), content_type=content_type
+        )
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    try:
+        full_path = Path(safe_join(settings.MEDIA_ROOT, path))
+    except SuspiciousFileOperation:
+        raise Http404
+    if not full_path.is_file():
+        raise Http404
+    stat = full_path.stat()
+    etag = quote_etag(f'{stat.st_size:x}-{stat.st_mtime_ns:x}')
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': _cache_control(path),
+    }
+    placeholder = HttpResponse()
+    for header, value in headers.items():
+        placeholder[header] = value
+    conditional = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(stat.st_mtime),
+        response=placeholder,
+    )
+    if conditional is not placeholder:
+        return conditional
+    response = _file_response(request, path, full_path, stat, etag)
+    for header, value in headers.items():
+        response[header] = value
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,147 @@
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
+
+from .cache import has_recent_write, record, versioned_key
+from .const import PAGE_CACHE_TIMEOUT, REPLICA_PIN_COOKIE, REPLICA_PIN_SECONDS
+from .routers import choose_replica, read_alias
+from .services import page_etag, publication_cutoff
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+CSRF_INPUT = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+CSRF_PLACEHOLDER = b'__csrf_token__'
+
+
+def strip_csrf_tokens(content):
+    """Заменяет токены в полях {% csrf_token %} заглушкой."""
+    return CSRF_INPUT.sub(rb'\1' + CSRF_PLACEHOLDER + rb'\2', content)
+
+
+def inject_csrf_token(content, request):
+    if CSRF_PLACEHOLDER not in content:
+        return content
+    # get_token() отмечает токен использованным: CsrfViewMiddleware
+    # выставит cookie, к которой он подходит.
+    return content.replace(CSRF_PLACEHOLDER, get_token(request).encode())
+
+
+class ReplicaPinMiddleware:
+    """Направляет чтение страниц ленты и поста в реплику.
+
+    После любого изменяющего запроса клиент получает cookie, и пока она
+    жива, все его запросы читают основную базу: пользователь сразу
+    видит свой пост или комментарий, даже если реплика отстаёт. Столько
+    же после любого изменения ленты основную базу читают все: страницы
+    нового поколения попадают в кэш страниц и в ETag.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = read_alias.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_alias.reset(token)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                getattr(settings, 'REPLICA_PIN_COOKIE', REPLICA_PIN_COOKIE),
+                '1',
+                max_age=getattr(
+                    settings, 'REPLICA_PIN_SECONDS', REPLICA_PIN_SECONDS
+                ),
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        pin_cookie = getattr(
+            settings, 'REPLICA_PIN_COOKIE', REPLICA_PIN_COOKIE
+        )
+        if (
+            request.method in SAFE_METHODS
+            and getattr(view_class, 'read_from_replica', False)
+            and pin_cookie not in request.COOKIES
+            and not has_recent_write()
+        ):
+            # Сессия и пользователь читаются из основной базы: реплика
+            # может не знать о только что выполненном входе.
+            request.user.is_authenticated
+            read_alias.set(choose_replica())
+
+
+class AnonymousPageCacheMiddleware:
+    """Отдаёт анонимным читателям страницы блога целиком из кэша.
+
+    Кэшируются GET-запросы к представлениям с PageCacheMixin, если
+    у клиента нет cookie сессии, то есть он точно не авторизован.
+    Ключ содержит поколение ленты, так что страницы сбрасывают те же
+    сигналы моделей. CSRF-токены хранятся заглушкой и подставляются
+    заново для каждого клиента.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        key = getattr(request, 'page_cache_key', None)
+        if key is None:
+            return response
+        patch_vary_headers(response, ('Cookie',))
+        if not getattr(response, 'from_page_cache', False) and (
+            self.can_store(request, response)
+        ):
+            cache.set(
+                key,
+                strip_csrf_tokens(response.content),
+                getattr(settings, 'PAGE_CACHE_TIMEOUT', PAGE_CACHE_TIMEOUT),
+            )
+        return response
+
+    def can_store(self, request, response):
+        # Чужие cookie (сессия, сообщения) означают персональный ответ.
+        return (
+            request.method == 'GET'
+            and response.status_code == 200
+            and not response.streaming
+            and all(
+                name == settings.CSRF_COOKIE_NAME
+                for name in response.cookies
+            )
+        )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        if (
+            request.method not in ('GET', 'HEAD')
+            or not getattr(view_class, 'cache_for_anonymous', False)
+            or settings.SESSION_COOKIE_NAME in request.COOKIES
+        ):
+            return None
+        request.page_cache_key = versioned_key(
+            'page', request.get_full_path(), publication_cutoff().isoformat()
+        )
+        content = cache.get(request.page_cache_key)
+        if content is None:
+            record('page', 'miss')
+            return None
+        record('page', 'hit')
+        etag = page_etag(request)
+        response = HttpResponse(inject_csrf_token(content, request))
+        response['ETag'] = etag
+        patch_cache_control(response, no_cache=True)
+        response = get_conditional_response(
+            request, etag=etag, response=response
+        )
+        response.from_page_cache = True
+        return response
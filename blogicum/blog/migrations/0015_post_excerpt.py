@@ -0,0 +1,37 @@
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+# blog.const.EXCERPT_WORDS на момент миграции.
+EXCERPT_WORDS = 10
+BATCH_SIZE = 500
+
+
+def fill_excerpt(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = Post.objects.using(schema_editor.connection.alias)
+    batch = []
+    for post in posts.only('pk', 'text').iterator(chunk_size=BATCH_SIZE):
+        post.excerpt = Truncator(post.text).words(
+            EXCERPT_WORDS, truncate=' …'
+        )
+        batch.append(post)
+        if len(batch) == BATCH_SIZE:
+            posts.bulk_update(batch, ['excerpt'])
+            batch = []
+    posts.bulk_update(batch, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name='Анонс'),
+        ),
+        migrations.RunPython(fill_excerpt, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,79 @@
+import re
+
+import snowballstemmer
+from django.db import migrations
+
+# Снимок blog/search.py на момент миграции: дальнейшие изменения модуля
+# не должны менять то, что создаёт эта миграция.
+SEARCH_TABLE = 'blog_post_search'
+WORD = re.compile(r'\w+')
+
+
+def create_sqlite_index(cursor, rows):
+    stemmer = snowballstemmer.stemmer('russian')
+
+    def stem(text):
+        return ' '.join(stemmer.stemWords(WORD.findall(text.lower())))
+
+    cursor.execute(
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} '
+        'USING fts5(title, text, '
+        "tokenize='unicode61 remove_diacritics 2')"
+    )
+    cursor.executemany(
+        f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+        'VALUES (%s, %s, %s)',
+        [(post_id, stem(title), stem(text)) for post_id, title, text in rows],
+    )
+
+
+def create_postgresql_index(cursor, rows):
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ('
+        'post_id bigint PRIMARY KEY '
+        'REFERENCES blog_post (id) ON DELETE CASCADE, '
+        'document tsvector NOT NULL)'
+    )
+    cursor.execute(
+        f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_idx '
+        f'ON {SEARCH_TABLE} USING gin (document)'
+    )
+    cursor.execute(
+        f'INSERT INTO {SEARCH_TABLE} (post_id, document) '
+        "SELECT id, setweight(to_tsvector('russian', title), 'A') || "
+        "setweight(to_tsvector('russian', text), 'B') FROM blog_post"
+    )
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    create = {
+        'sqlite': create_sqlite_index,
+        'postgresql': create_postgresql_index,
+    }.get(connection.vendor)
+    if create is None:
+        # Прочие СУБД ищут без индекса.
+        return
+    Post = apps.get_model('blog', 'Post')
+    rows = Post.objects.using(connection.alias).values_list(
+        'pk', 'title', 'text'
+    )
+    with connection.cursor() as cursor:
+        create(cursor, rows)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_post_image_hashed_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -1,14 +1,42 @@
+from django.conf import settings
 from django.contrib.auth.mixins import UserPassesTestMixin, LoginRequiredMixin
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.shortcuts import redirect
 from django.urls import reverse_lazy, reverse
 
+from .const import FEED_PAGINATION
 from .models import Post, Comment
 from .forms import PostForm, CommentForm
+from .paginators import CursorPaginator, InvalidCursor
+from .services import page_etag
 
 
-class AuthorCheckMixin(UserPassesTestMixin):
+class ReplicaReadMixin:
+    """Страница только читает данные, её запросы может обслужить реплика."""
+
+    read_from_replica = True
+
+
+class CachedObjectMixin:
+    """Запоминает объект представления на время запроса.
+
+    Представления переопределяют fetch_object(), а get_object() можно
+    вызывать сколько угодно раз: запрос к базе выполнится один раз.
+    """
+
+    def get_object(self, queryset=None):
+        if not hasattr(self, '_object'):
+            self._object = self.fetch_object(queryset)
+        return self._object
+
+    def fetch_object(self, queryset=None):
+        return super().get_object(queryset)
+
+
+class AuthorCheckMixin(CachedObjectMixin, UserPassesTestMixin):
     def test_func(self):
-        return self.get_object().author == self.request.user
+        return self.get_object().author_id == self.request.user.pk
 
 
 class PostMixin(LoginRequiredMixin, AuthorCheckMixin):
@@ -17,6 +45,9 @@ class PostMixin(LoginRequiredMixin, AuthorCheckMixin):
     template_name = 'blog/create.html'
     pk_url_kwarg = 'post_id'
 
+    def get_queryset(self):
+        return super().get_queryset().select_related('location')
+
     def handle_no_permission(self):
         return redirect(
             'blog:post_detail',
@@ -46,3 +77,61 @@ class CommentMixin(LoginRequiredMixin):
         return reverse(
             'blog:post_detail', kwargs={'post_id': self.kwargs['post_id']}
         )
+
+
+class CursorPaginationMixin:
+    cursor_kwarg = 'cursor'
+    cursor_ordering = ('-pub_date', '-pk')
+    # None — режим из настройки FEED_PAGINATION.
+    pagination = None
+
+    def paginate_queryset(self, queryset, page_size):
+        cursor = self.request.GET.get(self.cursor_kwarg)
+        mode = self.pagination or getattr(
+            settings, 'FEED_PAGINATION', FEED_PAGINATION
+        )
+        if cursor is None and mode != 'cursor':
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(
+            queryset, page_size, ordering=self.cursor_ordering
+        )
+        try:
+            page = paginator.page(cursor)
+        except InvalidCursor as e:
+            raise Http404(str(e))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class PageCacheMixin:
+    """Страница одинакова для всех анонимных читателей.
+
+    Такие страницы AnonymousPageCacheMiddleware отдаёт из кэша.
+    """
+
+    cache_for_anonymous = True
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 Not Modified, не выполняя запросов к постам."""
+
+    def get_etag(self):
+        return page_etag(self.request)
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag()
+        placeholder = HttpResponse()
+        placeholder['ETag'] = etag
+        conditional = get_conditional_response(
+            request, etag=etag, response=placeholder
+        )
+        if conditional is not placeholder:
+            return conditional
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            patch_cache_control(
+                response,
+                no_cache=True,
+                private=request.user.is_authenticated,
+            )
+        return response
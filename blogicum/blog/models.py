@@ -1,9 +1,16 @@
 from django.contrib.auth import get_user_model
 from django.db import models
-from django.utils.safestring import mark_safe
+from django.utils.html import format_html
+from django.utils.text import Truncator
+from django.utils.timezone import now
 
+from blog.const import EXCERPT_WORDS
 from blog.const import MAX_LENGTH_FIELD as MLF
 from blog.const import STR_LENGTH as SL
+from blog.renditions import rendition_url
+from blog.storage import post_image_storage
+from blog.services import publication_cutoff
+from blog.urlformats import fast_reverse
 
 User = get_user_model()
 
@@ -48,6 +55,9 @@ class Category(PublishedCreatedModel):
     def __str__(self):
         return self.title[:SL]
 
+    def get_absolute_url(self):
+        return fast_reverse('blog:category_posts', self.slug)
+
 
 class Location(PublishedCreatedModel):
     name = models.CharField('Название места', max_length=MLF)
@@ -60,9 +70,33 @@ class Location(PublishedCreatedModel):
         return self.name[:SL]
 
 
+def make_excerpt(text):
+    return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+
+
+class PostQuerySet(models.QuerySet):
+    def published(self, cutoff=None):
+        return self.filter(
+            is_published=True,
+            pub_date__lte=cutoff or publication_cutoff(),
+            category__is_published=True,
+        )
+
+    def visible_to(self, user):
+        visible = models.Q(is_published=True, pub_date__lte=now())
+        if user.is_authenticated:
+            visible |= models.Q(author=user)
+        return self.filter(visible)
+
+
 class Post(PublishedCreatedModel):
     title = models.CharField('Заголовок', max_length=MLF)
     text = models.TextField('Текст')
+    excerpt = models.TextField(
+        'Анонс',
+        blank=True,
+        editable=False
+    )
     pub_date = models.DateTimeField(
         'Дата и время публикации',
         null=False,
@@ -91,12 +125,27 @@ class Post(PublishedCreatedModel):
     image = models.ImageField(
         'Фото',
         upload_to='images',
+        storage=post_image_storage,
         blank=True
     )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False
+    )
+    updated_at = models.DateTimeField(
+        'Изменено',
+        auto_now=True
+    )
+
+    objects = PostQuerySet.as_manager()
 
     def image_tag(self):
-        return mark_safe(
-            '<img src="/images/%s" width="80" height="60" />' % (self.image)
+        if not self.image:
+            return ''
+        return format_html(
+            '<img src="{}" width="80" height="60" />',
+            rendition_url(self.image, 'thumb')
         )
 
     image_tag.short_description = 'Image'
@@ -106,10 +155,50 @@ class Post(PublishedCreatedModel):
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
+        indexes = (
+            models.Index(
+                fields=('-pub_date',),
+                condition=models.Q(is_published=True),
+                name='post_published_pub_date_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date'),
+                condition=models.Q(is_published=True),
+                name='post_category_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title[:SL]
 
+    def get_absolute_url(self):
+        return fast_reverse('blog:post_detail', self.pk)
+
+    def save(self, *args, **kwargs):
+        self.excerpt = make_excerpt(self.text)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
+
+    def save_edits(self):
+        """Сохраняет правку загруженного ранее поста.
+
+        comment_count меняют только F()-выражения сигналов: правка
+        не должна затирать комментарии, добавленные после загрузки.
+        """
+        deferred = self.get_deferred_fields()
+        self.save(update_fields=[
+            field.name for field in self._meta.concrete_fields
+            if not field.primary_key
+            and field.attname not in deferred
+            and field.name != 'comment_count'
+        ])
+
 
 class Comment(CreatedAt):
     text = models.TextField('Текст комментария')
@@ -132,3 +221,47 @@ class Comment(CreatedAt):
 
     def __str__(self):
         return self.text[:SL]
+
+    def get_absolute_url(self):
+        # Якорь комментария на странице поста, см. includes/comments.html.
+        return (
+            f'{fast_reverse("blog:post_detail", self.post_id)}'
+            f'#comment_{self.pk}'
+        )
+
+
+class ImageJob(CreatedAt):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Обрабатывается'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_job',
+        verbose_name='Пост',
+    )
+    image = models.CharField('Файл изображения', max_length=MLF)
+    status = models.CharField(
+        'Статус',
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+
+    class Meta(CreatedAt.Meta):
+        verbose_name = 'обработка изображения'
+        verbose_name_plural = 'Обработка изображений'
+
+    def __str__(self):
+        return f'{self.image} ({self.get_status_display()})'
@@ -0,0 +1,176 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import DateTimeField, IntegerField, Q
+from django.utils.dateparse import parse_datetime
+
+NEXT = 'n'
+PREVIOUS = 'p'
+BIGINT_MIN, BIGINT_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class CursorPage:
+    """Страница ключевой пагинации.
+
+    Повторяет интерфейс django.core.paginator.Page, которым пользуются
+    шаблоны, но вместо номеров страниц отдаёт непрозрачные курсоры.
+    """
+
+    is_cursor = True
+    number = None
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<Cursor page of %s>' % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Пагинация по ключу (keyset) вместо OFFSET.
+
+    Страница выбирается условием по значениям полей сортировки последней
+    (или первой) записи предыдущей страницы, поэтому глубокие страницы
+    стоят столько же, сколько первая, и COUNT(*) не нужен.
+    Последнее поле ordering должно быть уникальным.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-pk')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+
+    def page(self, cursor=None):
+        direction, values = NEXT, None
+        if cursor:
+            direction, values = self.decode_cursor(cursor)
+        ordering = self.ordering
+        if direction == PREVIOUS:
+            ordering = tuple(self._reverse(field) for field in ordering)
+        queryset = self.queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._after(ordering, values))
+        object_list = list(queryset[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if direction == PREVIOUS:
+            object_list.reverse()
+        if not object_list:
+            return CursorPage(object_list, self, None, None)
+        if direction == PREVIOUS:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+        return CursorPage(
+            object_list,
+            self,
+            self.encode_cursor(NEXT, object_list[-1]) if has_next else None,
+            self.encode_cursor(PREVIOUS, object_list[0])
+            if has_previous else None,
+        )
+
+    def encode_cursor(self, direction, obj):
+        values = []
+        for field in self.ordering:
+            value = getattr(obj, field.lstrip('-'))
+            if isinstance(value, datetime):
+                value = {'dt': value.isoformat()}
+            values.append(value)
+        payload = json.dumps([direction, values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(
+            payload.encode()
+        ).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            payload = base64.urlsafe_b64decode(
+                cursor + '=' * (-len(cursor) % 4)
+            )
+            direction, values = json.loads(payload)
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+            raise InvalidCursor('Неверный курсор страницы.')
+        if direction not in (NEXT, PREVIOUS) or not isinstance(
+            values, list
+        ) or len(values) != len(self.ordering):
+            raise InvalidCursor('Неверный курсор страницы.')
+        try:
+            decoded = [
+                self._decode_value(field, value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (FieldDoesNotExist, ValidationError, ValueError, TypeError):
+            raise InvalidCursor('Неверный курсор страницы.')
+        return direction, decoded
+
+    def _decode_value(self, field, value):
+        # Значение из курсора проверяется полем модели: подделанный
+        # курсор должен давать 404, а не ошибку в запросе к базе.
+        model_field = self._field(field.lstrip('-'))
+        is_datetime = isinstance(model_field, DateTimeField)
+        if is_datetime != isinstance(value, dict) or value is None:
+            raise ValueError(value)
+        if is_datetime:
+            value = parse_datetime(str(value.get('dt')))
+            if value is None:
+                raise ValueError(value)
+        value = model_field.to_python(value)
+        model_field.run_validators(value)
+        # SQLite не сообщает диапазон целых, и валидаторы его не проверят.
+        if isinstance(model_field, IntegerField) and not (
+            BIGINT_MIN <= value <= BIGINT_MAX
+        ):
+            raise ValueError(value)
+        return value
+
+    def _field(self, name):
+        opts = self.queryset.model._meta
+        if name == 'pk':
+            return opts.pk
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return opts.get_field(name)
+
+    @staticmethod
+    def _reverse(field):
+        return field[1:] if field.startswith('-') else '-' + field
+
+    @staticmethod
+    def _after(ordering, values):
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
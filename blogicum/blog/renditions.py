@@ -0,0 +1,124 @@
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+RENDITIONS = {
+    'card': (640, 640),
+    'detail': (1280, 1280),
+    'thumb': (80, 60),
+}
+# Копии для страниц сайта дополнительно кодируются в современные форматы;
+# порядок важен: браузер берёт первый поддерживаемый <source>.
+MODERN_RENDITIONS = ('card', 'detail')
+MODERN_FORMATS = (
+    ('AVIF', 'avif', 'image/avif', {'quality': 60}),
+    ('WEBP', 'webp', 'image/webp', {'quality': 80}),
+)
+
+
+def supported_formats():
+    Image.init()
+    return [
+        image_format for image_format in MODERN_FORMATS
+        if image_format[0] in Image.SAVE and (
+            image_format[0] != 'WEBP' or features.check('webp')
+        )
+    ]
+
+
+def rendition_name(name, rendition, extension=None):
+    root, ext = os.path.splitext(name)
+    if extension is not None:
+        ext = f'.{extension}'
+    return f'{root}.{rendition}{ext}'
+
+
+def rendition_names(name):
+    names = [rendition_name(name, rendition) for rendition in RENDITIONS]
+    for _, extension, _, _ in supported_formats():
+        names.extend(
+            rendition_name(name, rendition, extension)
+            for rendition in MODERN_RENDITIONS
+        )
+    return names
+
+
+def rendition_url(field_file, rendition):
+    """URL уменьшенной копии или оригинала, если копии ещё нет."""
+    if not field_file:
+        return ''
+    name = rendition_name(field_file.name, rendition)
+    if field_file.storage.exists(name):
+        return field_file.storage.url(name)
+    return field_file.url
+
+
+def rendition_sources(field_file, rendition):
+    """Готовые копии в современных форматах: [(MIME-тип, URL)]."""
+    if not field_file:
+        return []
+    storage = field_file.storage
+    sources = []
+    for _, extension, mime_type, _ in supported_formats():
+        name = rendition_name(field_file.name, rendition, extension)
+        if storage.exists(name):
+            sources.append((mime_type, storage.url(name)))
+    return sources
+
+
+def has_renditions(field_file):
+    return all(
+        field_file.storage.exists(name)
+        for name in rendition_names(field_file.name)
+    )
+
+
+def _encode(image, image_format, **options):
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    elif image_format in ('WEBP', 'AVIF') and image.mode not in (
+        'RGB', 'RGBA'
+    ):
+        has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+    buffer = BytesIO()
+    image.save(buffer, image_format, optimize=True, **options)
+    return buffer.getvalue()
+
+
+def _store(storage, name, content):
+    if hasattr(storage, 'save_derived'):
+        storage.save_derived(name, ContentFile(content))
+        return
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(content))
+
+
+def generate_renditions(field_file):
+    """Создаёт все копии изображения; метаданные EXIF в них не попадают."""
+    storage = field_file.storage
+    with storage.open(field_file.name, 'rb') as source:
+        original = Image.open(source)
+        image_format = original.format
+        image = ImageOps.exif_transpose(original)
+        image.load()
+    modern_formats = supported_formats()
+    for rendition, size in RENDITIONS.items():
+        resized = image.copy()
+        resized.thumbnail(size, Image.Resampling.LANCZOS)
+        _store(
+            storage,
+            rendition_name(field_file.name, rendition),
+            _encode(resized, image_format),
+        )
+        if rendition not in MODERN_RENDITIONS:
+            continue
+        for modern_format, extension, _, options in modern_formats:
+            _store(
+                storage,
+                rendition_name(field_file.name, rendition, extension),
+                _encode(resized, modern_format, **options),
+            )
@@ -0,0 +1,38 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Алиас реплики для чтения в текущем запросе; None — основная база.
+read_alias = ContextVar('read_alias', default=None)
+
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def choose_replica():
+    replicas = get_replicas()
+    return random.choice(replicas) if replicas else None
+
+
+class ReplicaRouter:
+    """Чтение — из реплики, выбранной для запроса, запись — в основную базу.
+
+    Реплику выбирает ReplicaPinMiddleware и только для представлений
+    с read_from_replica = True; остальные запросы целиком идут
+    в основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
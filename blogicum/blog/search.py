@@ -0,0 +1,194 @@
+import re
+
+import snowballstemmer
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = 'blog_post_search'
+WORD = re.compile(r'\w+')
+# Заголовок важнее текста.
+TITLE_WEIGHT = 4.0
+MAX_QUERY_LENGTH = 200
+
+_stemmer = snowballstemmer.stemmer('russian')
+
+
+def stem(text):
+    """Основы слов текста через пробел: «постами» и «пост» совпадут."""
+    return ' '.join(_stemmer.stemWords(WORD.findall(text.lower())))
+
+
+def nothing(queryset):
+    # rank нужен и пустому результату: по нему сортирует пагинатор.
+    return queryset.annotate(
+        rank=Value(0.0, output_field=FloatField())
+    ).none()
+
+
+class SQLiteSearch:
+    """FTS5: в таблице хранятся основы слов, rowid совпадает с id поста.
+
+    В FTS5 нет русского стеммера, поэтому текст приводится к основам
+    в Python и при индексации, и при поиске.
+    """
+
+    def create(self, cursor):
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} '
+            'USING fts5(title, text, '
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+
+    def drop(self, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+    def index(self, cursor, post_id, title, text):
+        self.remove(cursor, post_id)
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            (post_id, stem(title), stem(text)),
+        )
+
+    def remove(self, cursor, post_id):
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', (post_id,)
+        )
+
+    def search(self, queryset, query):
+        terms = stem(query).split()
+        if not terms:
+            return nothing(queryset)
+        match = ' '.join(f'"{term}"' for term in terms)
+        table = queryset.model._meta.db_table
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s',
+            (match,),
+        )).annotate(rank=RawSQL(
+            f'SELECT -bm25({SEARCH_TABLE}, {TITLE_WEIGHT}, 1.0) '
+            f'FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s '
+            f'AND rowid = "{table}"."id"',
+            (match,),
+            output_field=FloatField(),
+        ))
+
+
+class PostgresSearch:
+    """tsvector с русской конфигурацией и GIN-индексом."""
+
+    document = (
+        "setweight(to_tsvector('russian', %s), 'A') || "
+        "setweight(to_tsvector('russian', %s), 'B')"
+    )
+    tsquery = "websearch_to_tsquery('russian', %s)"
+
+    def create(self, cursor):
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ('
+            'post_id bigint PRIMARY KEY '
+            'REFERENCES blog_post (id) ON DELETE CASCADE, '
+            'document tsvector NOT NULL)'
+        )
+        cursor.execute(
+            f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_idx '
+            f'ON {SEARCH_TABLE} USING gin (document)'
+        )
+
+    def drop(self, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+    def index(self, cursor, post_id, title, text):
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (post_id, document) '
+            f'VALUES (%s, {self.document}) ON CONFLICT (post_id) '
+            'DO UPDATE SET document = EXCLUDED.document',
+            (post_id, title, text),
+        )
+
+    def remove(self, cursor, post_id):
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE post_id = %s', (post_id,)
+        )
+
+    def search(self, queryset, query):
+        table = queryset.model._meta.db_table
+        # ts_rank по умолчанию даёт весам A и B 1.0 и 0.4.
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT post_id FROM {SEARCH_TABLE} '
+            f'WHERE document @@ {self.tsquery}',
+            (query,),
+        )).annotate(rank=RawSQL(
+            f'SELECT ts_rank(document, {self.tsquery}) '
+            f'FROM {SEARCH_TABLE} WHERE post_id = "{table}"."id"',
+            (query,),
+            output_field=FloatField(),
+        ))
+
+
+class FallbackSearch:
+    """Для прочих СУБД: без индекса и без ранжирования."""
+
+    def create(self, cursor):
+        pass
+
+    drop = create
+
+    def index(self, cursor, post_id, title, text):
+        pass
+
+    def remove(self, cursor, post_id):
+        pass
+
+    def search(self, queryset, query):
+        return queryset.filter(
+            Q(title__icontains=query) | Q(text__icontains=query)
+        ).annotate(rank=Value(0.0, output_field=FloatField()))
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearch(),
+    'postgresql': PostgresSearch(),
+}
+
+
+def get_backend(connection):
+    return BACKENDS.get(connection.vendor, FallbackSearch())
+
+
+def create_index(connection):
+    with connection.cursor() as cursor:
+        get_backend(connection).create(cursor)
+
+
+def drop_index(connection):
+    with connection.cursor() as cursor:
+        get_backend(connection).drop(cursor)
+
+
+def index_posts(rows, using=DEFAULT_DB_ALIAS):
+    """Индексирует посты из итерируемого (id, title, text)."""
+    connection = connections[using]
+    backend = get_backend(connection)
+    with connection.cursor() as cursor:
+        for post_id, title, text in rows:
+            backend.index(cursor, post_id, title, text)
+
+
+def index_post(post, using=DEFAULT_DB_ALIAS):
+    index_posts([(post.pk, post.title, post.text)], using=using)
+
+
+def remove_post(post_id, using=DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        get_backend(connection).remove(cursor, post_id)
+
+
+def search_posts(queryset, query):
+    """Посты queryset, подходящие под запрос, с аннотацией rank."""
+    query = query.strip()[:MAX_QUERY_LENGTH]
+    if not query:
+        return nothing(queryset)
+    backend = get_backend(connections[queryset.db])
+    return backend.search(queryset, query)
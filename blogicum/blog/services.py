@@ -1,20 +1,82 @@
-from django.db.models import Count
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
 from django.utils.timezone import now
 
+from .cache import get_generation
+from .const import PUBLICATION_CUTOFF_GRANULARITY
+
+
+def publication_cutoff():
+    """Момент, до которого посты считаются опубликованными.
+
+    Округляется вниз до PUBLICATION_CUTOFF_GRANULARITY секунд, чтобы
+    одинаковые запросы в пределах окна давали одинаковый SQL и кэш.
+    """
+    granularity = getattr(
+        settings,
+        'PUBLICATION_CUTOFF_GRANULARITY',
+        PUBLICATION_CUTOFF_GRANULARITY
+    )
+    moment = now()
+    if granularity:
+        moment = moment.replace(microsecond=0) - timedelta(
+            seconds=int(moment.timestamp()) % granularity
+        )
+    return moment
+
+
+def page_etag(request):
+    """Слабый ETag страницы блога, вычисляемый без запросов к постам.
+
+    Поколение ленты увеличивают сигналы при любом изменении постов,
+    комментариев, категорий, местоположений и пользователей; читатель
+    и его CSRF-cookie тоже влияют на разметку.
+    """
+    user = getattr(request, 'user', None)
+    parts = (
+        get_generation(),
+        request.get_full_path(),
+        publication_cutoff().isoformat(),
+        user.pk if user is not None else None,
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+    )
+    digest = hashlib.md5(
+        '\x1f'.join(str(part) for part in parts).encode()
+    ).hexdigest()
+    # Слабый: маска CSRF-токена меняет байты, но не смысл страницы.
+    return f'W/"{digest}"'
+
+
+POST_CARD_FIELDS = (
+    'title',
+    'excerpt',
+    'pub_date',
+    'is_published',
+    'image',
+    'comment_count',
+    'updated_at',
+    'author__username',
+    'category__slug',
+    'category__title',
+    'category__is_published',
+    'location__name',
+    'location__is_published',
+)
+
 
-def annotate_post_with_comments(queryset):
+def select_post_relations(queryset):
     return queryset.select_related(
         'author',
         'category',
         'location',
-    ).order_by('-pub_date').annotate(
-        comment_count=Count('comments')
-    )
+    ).order_by('-pub_date')
+
+
+def select_post_cards(queryset):
+    return select_post_relations(queryset).only(*POST_CARD_FIELDS)
 
 
 def filter_posted_posts(queryset):
-    return queryset.filter(
-        is_published=True,
-        pub_date__lte=now(),
-        category__is_published=True,
-    )
+    return queryset.published()
@@ -0,0 +1,90 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import search
+from .cache import bump_generation
+from .models import Category, Comment, Location, Post, User
+from .jobs import enqueue
+from .renditions import has_renditions
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, raw=False, **kwargs):
+    # Комментарий могут перенести к другому посту, например в админке.
+    instance.previous_post_id = None
+    if not raw and not instance._state.adding:
+        instance.previous_post_id = Comment.objects.filter(
+            pk=instance.pk
+        ).values_list('post_id', flat=True).first()
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    if kwargs.get('raw'):
+        return
+    previous_post_id = getattr(instance, 'previous_post_id', None)
+    moved = previous_post_id not in (None, instance.post_id)
+    if created or moved:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1
+        )
+    if moved:
+        Post.objects.filter(pk=previous_post_id, comment_count__gt=0).update(
+            comment_count=F('comment_count') - 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_feed_cache(sender, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    bump_generation()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_post_cards(sender, update_fields=None, **kwargs):
+    # Карточка показывает данные категории, места и автора, которые не
+    # входят в её ключ, поэтому их изменение сбрасывает все карточки.
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    bump_generation('cards')
+
+
+@receiver(post_save, sender=Post)
+def queue_image_renditions(sender, instance, raw=False, **kwargs):
+    if not raw and instance.image and not has_renditions(instance.image):
+        enqueue(instance)
+
+
+@receiver(post_save, sender=Post)
+def index_post_for_search(sender, instance, using, update_fields=None,
+                          **kwargs):
+    if update_fields is None or {'title', 'text'} & set(update_fields):
+        search.index_post(instance, using=using)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_search(sender, instance, using, **kwargs):
+    search.remove_post(instance.pk, using=using)
@@ -0,0 +1,105 @@
+import hashlib
+import os
+import posixpath
+import re
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+EXTENSION = re.compile(r'^\.[A-Za-z0-9]{1,10}$')
+COLLECTED_SUFFIX = '.collected'
+
+
+def file_digest(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+@deconstructible
+class HashedImageStorage(FileSystemStorage):
+    """Хранит загрузки под SHA-256 содержимого: images/ab/<sha256>.jpg.
+
+    Одинаковые файлы сохраняются один раз, а имя файла никогда не
+    указывает на другое содержимое, поэтому URL можно кэшировать навсегда.
+    """
+
+    def hashed_name(self, name, content):
+        directory, basename = posixpath.split(name)
+        extension = os.path.splitext(basename)[1].lower()
+        if not EXTENSION.match(extension):
+            extension = ''
+        digest = getattr(content, 'sha256', None) or file_digest(content)
+        return posixpath.join(directory, digest[:2], digest + extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if getattr(content, 'oversized', False):
+            # HashingUploadHandler не записал часть файла: сохранять нечего.
+            raise SuspiciousFileOperation(
+                f'Загрузка {name} превышает IMAGE_UPLOAD_MAX_SIZE.'
+            )
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if self.exists(name) and self.touch(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    def touch(self, name):
+        """Обновляет время изменения уже сохранённого файла.
+
+        Свежий файл collect_images не трогает, пока пост с ним ещё не
+        сохранён. False — файл только что удалён и его надо записать.
+        """
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def delete_unused(self, name, cutoff, is_referenced):
+        """Удаляет файл старше cutoff, если is_referenced(name) ложно.
+
+        Файл сначала атомарно переименовывается. save() с тем же
+        содержимым после этого его не найдёт и запишет заново, а
+        touch(), успевший раньше, виден по времени изменения: тогда
+        файл возвращается на место. Возвращает True, если файл удалён.
+        """
+        path = self.path(name)
+        collected = path + COLLECTED_SUFFIX
+        try:
+            os.rename(path, collected)
+        except FileNotFoundError:
+            return False
+        deleted = False
+        try:
+            if os.path.getmtime(collected) <= cutoff.timestamp() and (
+                not is_referenced(name)
+            ):
+                os.remove(collected)
+                deleted = True
+        finally:
+            # И при ошибке запроса: файл поста не должен остаться под
+            # временным именем.
+            if not deleted:
+                if os.path.exists(path):
+                    # Файл уже записан заново: содержимое то же.
+                    os.remove(collected)
+                else:
+                    os.rename(collected, path)
+        # Если файл уже записан заново, удалена только старая копия.
+        return deleted and not os.path.exists(path)
+
+    def save_derived(self, name, content):
+        """Сохраняет производный файл (копию) под заданным именем."""
+        if self.exists(name):
+            self.delete(name)
+        return super().save(name, content)
+
+
+post_image_storage = HashedImageStorage()
@@ -0,0 +1,137 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+
+from blog.cache import get_generation, make_key, record
+from blog.const import CARD_CACHE_TIMEOUT
+from blog.renditions import rendition_sources, rendition_url
+from blog.urlformats import fast_reverse
+
+register = template.Library()
+
+
+CARDS_STATE = 'blog.cards'
+
+
+def card_state(context):
+    """Поколение карточек и прочитанные заранее карточки страницы.
+
+    Хранится в корне render_context: поколение читается из кэша один
+    раз за отрисовку страницы, а не для каждой карточки.
+    """
+    root = context.render_context.dicts[0]
+    if CARDS_STATE not in root:
+        root[CARDS_STATE] = {
+            'generation': get_generation('cards'),
+            'prefetched': {},
+        }
+    return root[CARDS_STATE]
+
+
+def card_key(post, generation):
+    return make_key(
+        'card',
+        generation,
+        post.pk,
+        post.updated_at.isoformat(),
+        post.comment_count,
+    )
+
+
+class PostCardNode(template.Node):
+    """Карточка поста из кэша или includes/post_card.html.
+
+    В отличие от {% include %} в цикле, шаблон ищется один раз за
+    отрисовку страницы, а адреса собираются из готовых форматов
+    fast_reverse() вместо {% url %}. Карточки, прочитанные
+    {% prefetch_cards %}, повторно в кэше не ищутся.
+    """
+
+    template_name = 'includes/post_card.html'
+
+    def __init__(self, post):
+        self.post = post
+
+    def get_template(self, context):
+        templates = context.render_context.dicts[0]
+        if self not in templates:
+            templates[self] = context.template.engine.get_template(
+                self.template_name
+            )
+        return templates[self]
+
+    def render(self, context):
+        post = self.post.resolve(context)
+        state = card_state(context)
+        key = card_key(post, state['generation'])
+        if key in state['prefetched']:
+            content = state['prefetched'].pop(key)
+        else:
+            content = cache.get(key)
+            record('card', 'miss' if content is None else 'hit')
+        if content is not None:
+            return content
+        urls = {
+            'detail_url': post.get_absolute_url(),
+            'profile_url': post.author.get_absolute_url(),
+            'category_url': (
+                post.category.get_absolute_url() if post.category else ''
+            ),
+        }
+        with context.push(post=post, **urls):
+            content = self.get_template(context).render(context)
+        cache.set(
+            key,
+            content,
+            getattr(settings, 'CARD_CACHE_TIMEOUT', CARD_CACHE_TIMEOUT),
+        )
+        return content
+
+
+@register.simple_tag(takes_context=True)
+def prefetch_cards(context, posts):
+    """Читает карточки страницы одним get_many().
+
+    {% prefetch_cards page_obj %} ставится перед циклом с {% post_card %};
+    счётчики попаданий обновляются один раз на страницу.
+    """
+    state = card_state(context)
+    keys = [card_key(post, state['generation']) for post in posts]
+    found = cache.get_many(keys)
+    state['prefetched'].update((key, found.get(key)) for key in keys)
+    record('card', 'hit', len(found))
+    record('card', 'miss', len(keys) - len(found))
+    return ''
+
+
+@register.tag
+def post_card(parser, token):
+    """Карточка поста в ленте: {% post_card post %}."""
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(
+            f'Тег {bits[0]} принимает ровно один аргумент — пост.'
+        )
+    return PostCardNode(parser.compile_filter(bits[1]))
+
+
+@register.simple_tag
+def fast_url(viewname, *args, **kwargs):
+    """Как {% url %}, но через готовые форматы fast_reverse()."""
+    return fast_reverse(viewname, *args, **kwargs)
+
+
+@register.filter
+def rendition(field_file, name):
+    """URL уменьшенной копии изображения: {{ post.image|rendition:'card' }}."""
+    return rendition_url(field_file, name)
+
+
+@register.inclusion_tag('includes/picture.html')
+def picture(field_file, rendition, css_class=''):
+    """<picture> с копиями в AVIF/WebP и исходным форматом как запасным."""
+    return {
+        'sources': rendition_sources(field_file, rendition),
+        'fallback': rendition_url(field_file, rendition),
+        'css_class': css_class,
+    }
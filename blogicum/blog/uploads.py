@@ -0,0 +1,43 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+from .const import IMAGE_UPLOAD_MAX_SIZE
+
+
+class HashingUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузку во временный файл по частям, считая SHA-256.
+
+    В памяти держится только текущая часть. Всё, что сверх
+    IMAGE_UPLOAD_MAX_SIZE, не записывается: файл помечается oversized.
+    PostImageField отклоняет такой файл, не открывая в Pillow, а
+    HashedImageStorage отказывается его сохранять на любом другом пути.
+    """
+
+    def new_file(self, *args, **kwargs):
+        temp_dir = getattr(settings, 'FILE_UPLOAD_TEMP_DIR', None)
+        if temp_dir:
+            os.makedirs(temp_dir, exist_ok=True)
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+        self.received = 0
+        self.limit = getattr(
+            settings, 'IMAGE_UPLOAD_MAX_SIZE', IMAGE_UPLOAD_MAX_SIZE
+        )
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.limit:
+            return None
+        self.digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.oversized = self.received > self.limit
+        if not file.oversized:
+            # Хранилище возьмёт готовый хеш вместо повторного чтения файла.
+            file.sha256 = self.digest.hexdigest()
+        return file
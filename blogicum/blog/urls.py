@@ -44,6 +44,16 @@ urlpatterns = [
         views.CommentDeleteView.as_view(),
         name='delete_comment'
     ),
+    path(
+        'search/',
+        views.SearchView.as_view(),
+        name='search'
+    ),
+    path(
+        'cache-stats/',
+        views.CacheStatsView.as_view(),
+        name='cache_stats'
+    ),
     path(
         'category/<slug:category_slug>/',
         views.CategoryListView.as_view(),
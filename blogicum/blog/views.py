@@ -1,19 +1,34 @@
-from django.http import Http404
+from urllib.parse import urlencode
+
+from django.db import transaction
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
-from django.utils.timezone import now
 from django.urls import reverse_lazy
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import (
-    CreateView, DeleteView, ListView, UpdateView
+    CreateView, DeleteView, ListView, UpdateView, View
 )
 
 from blog.models import Category, Post, User
+from .cache import STATS_NAMES, get_stats
 from .const import PAGINATOR_LENGTH as PL
 from .forms import (
     PostForm, UserUpdateForm, CommentForm, CustomUserCreationForm
 )
-from .mixins import PostMixin, CommentMixin, AuthorCheckMixin
-from .services import annotate_post_with_comments, filter_posted_posts
+from .mixins import (
+    AuthorCheckMixin,
+    CachedObjectMixin,
+    CommentMixin,
+    ConditionalGetMixin,
+    CursorPaginationMixin,
+    PageCacheMixin,
+    PostMixin,
+    ReplicaReadMixin,
+)
+from .search import search_posts
+from .services import (
+    filter_posted_posts, select_post_cards, select_post_relations
+)
 
 
 class RegistrationCreateView(CreateView):
@@ -22,18 +37,26 @@ class RegistrationCreateView(CreateView):
     success_url = reverse_lazy('blog:index')
 
 
-class IndexListView(ListView):
+class IndexListView(
+    ReplicaReadMixin, ConditionalGetMixin, PageCacheMixin,
+    CursorPaginationMixin, ListView
+):
     model = Post
     template_name = 'blog/index.html'
     paginate_by = PL
-    queryset = annotate_post_with_comments(filter_posted_posts(Post.objects))
 
+    def get_queryset(self):
+        return select_post_cards(Post.objects.published())
 
-class CategoryListView(ListView):
+
+class CategoryListView(
+    ReplicaReadMixin, ConditionalGetMixin, PageCacheMixin,
+    CachedObjectMixin, CursorPaginationMixin, ListView
+):
     template_name = 'blog/category.html'
     paginate_by = PL
 
-    def get_object(self):
+    def fetch_object(self, queryset=None):
         return get_object_or_404(
             Category,
             slug=self.kwargs['category_slug'],
@@ -41,7 +64,7 @@ class CategoryListView(ListView):
         )
 
     def get_queryset(self):
-        return annotate_post_with_comments(
+        return select_post_cards(
             filter_posted_posts(self.get_object().posts)
         )
 
@@ -52,11 +75,14 @@ class CategoryListView(ListView):
         return context
 
 
-class ProfileListView(ListView):
+class ProfileListView(
+    ReplicaReadMixin, ConditionalGetMixin, PageCacheMixin,
+    CachedObjectMixin, CursorPaginationMixin, ListView
+):
     template_name = 'blog/profile.html'
     paginate_by = PL
 
-    def get_object(self):
+    def fetch_object(self, queryset=None):
         return get_object_or_404(
             User,
             username=self.kwargs['username']
@@ -64,7 +90,7 @@ class ProfileListView(ListView):
 
     def get_queryset(self):
         profile = self.get_object()
-        posts = annotate_post_with_comments(profile.posts)
+        posts = select_post_cards(profile.posts)
         if self.request.user != profile:
             posts = filter_posted_posts(posts)
         return posts
@@ -75,6 +101,29 @@ class ProfileListView(ListView):
         return context
 
 
+class SearchView(ReplicaReadMixin, CursorPaginationMixin, ListView):
+    template_name = 'blog/search.html'
+    paginate_by = PL
+    pagination = 'cursor'
+    cursor_ordering = ('-rank', '-pk')
+
+    def get_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        return search_posts(
+            select_post_cards(filter_posted_posts(Post.objects.all())),
+            self.get_query(),
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.get_query()
+        context['query'] = query
+        context['query_prefix'] = urlencode({'q': query}) + '&'
+        return context
+
+
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     model = User
     form_class = UserUpdateForm
@@ -105,20 +154,21 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         )
 
 
-class PostDetailView(ListView):
+class PostDetailView(
+    ReplicaReadMixin, ConditionalGetMixin, PageCacheMixin,
+    CachedObjectMixin, ListView
+):
     model = Post
     pk_field = 'post_id'
     pk_url_kwarg = 'post_id'
     template_name = 'blog/detail.html'
     paginate_by = PL
 
-    def get_object(self):
-        post = get_object_or_404(Post, id=self.kwargs[self.pk_url_kwarg])
-        if self.request.user != post.author and (
-            post.pub_date > now() or not post.is_published
-        ):
-            raise Http404
-        return post
+    def fetch_object(self, queryset=None):
+        return get_object_or_404(
+            select_post_relations(Post.objects.visible_to(self.request.user)),
+            id=self.kwargs[self.pk_url_kwarg]
+        )
 
     def get_queryset(self):
         return self.get_object().comments.select_related('author')
@@ -134,7 +184,7 @@ class PostUpdateView(PostMixin, UpdateView):
     def get_success_url(self):
         return reverse_lazy(
             'blog:post_detail',
-            kwargs={self.pk_url_kwarg: self.get_object().pk}
+            kwargs={self.pk_url_kwarg: self.object.pk}
         )
 
 
@@ -143,6 +193,7 @@ class PostDeleteView(PostMixin, DeleteView):
 
 
 class CommentCreate(CommentMixin, CreateView):
+    @transaction.atomic
     def form_valid(self, form):
         form.instance.author = self.request.user
         form.instance.post = get_object_or_404(Post, id=self.kwargs['post_id'])
@@ -155,3 +206,17 @@ class CommentUpdateView(CommentMixin, AuthorCheckMixin, UpdateView):
 
 class CommentDeleteView(CommentMixin, AuthorCheckMixin, DeleteView):
     ...
+
+
+class CacheStatsView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """Счётчики кэша страниц и карточек из кэша самого сервера.
+
+    manage.py cache_stats видит их, только если кэш общий; с кэшем
+    в памяти процесса счётчики доступны лишь здесь.
+    """
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request):
+        return JsonResponse({name: get_stats(name) for name in STATS_NAMES})
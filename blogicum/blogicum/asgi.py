@@ -11,6 +11,10 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from blogicum.startup import startup
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_asgi_application()
+
+startup()
@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+
+import psycopg2.extras
+from django.db.backends.postgresql import base
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+
+# Сколько секунд ждать свободного соединения, прежде чем открыть
+# соединение в обход пула.
+POOL_TIMEOUT = 5
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class BlockingConnectionPool(ThreadedConnectionPool):
+    """Пул, который при исчерпании ждёт возврата соединения.
+
+    ThreadedConnectionPool в этом случае сразу бросает PoolError.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._available = threading.Condition()
+        super().__init__(*args, **kwargs)
+
+    def getconn(self, key=None, timeout=0):
+        deadline = time.monotonic() + timeout
+        with self._available:
+            while True:
+                try:
+                    return super().getconn(key)
+                except PoolError:
+                    remaining = deadline - time.monotonic()
+                    if self.closed or remaining <= 0:
+                        raise
+                    self._available.wait(remaining)
+
+    def putconn(self, conn=None, key=None, close=False):
+        super().putconn(conn, key, close)
+        with self._available:
+            self._available.notify()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL с проверкой соединений и необязательным пулом.
+
+    CONN_HEALTH_CHECKS: перед первым запросом после начала или конца
+    HTTP-запроса постоянное соединение проверяется и при обрыве
+    переоткрывается, а не роняет запрос.
+
+    POOL = {'MIN_SIZE': ..., 'MAX_SIZE': ..., 'TIMEOUT': ...}: соединения
+    берутся из пула процесса и возвращаются в него при закрытии. Если
+    все MAX_SIZE соединений заняты, поток ждёт до TIMEOUT секунд,
+    а затем открывает соединение в обход пула, а не падает.
+    """
+
+    health_check_done = False
+
+    @property
+    def health_check_enabled(self):
+        return self.settings_dict.get('CONN_HEALTH_CHECKS', False)
+
+    def get_pool(self, conn_params):
+        options = self.settings_dict.get('POOL')
+        if not options:
+            return None
+        # После fork пул родителя использовать нельзя; имя тестовой базы
+        # отличается от рабочей, поэтому параметры тоже входят в ключ.
+        key = (os.getpid(), self.alias, repr(sorted(conn_params.items())))
+        with _pools_lock:
+            if key not in _pools:
+                _pools[key] = BlockingConnectionPool(
+                    options.get('MIN_SIZE', 1),
+                    options['MAX_SIZE'],
+                    **conn_params,
+                )
+            return _pools[key]
+
+    def get_new_connection(self, conn_params):
+        self._pool = None
+        pool = self.get_pool(conn_params)
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        try:
+            connection = pool.getconn(timeout=self.settings_dict['POOL'].get(
+                'TIMEOUT', POOL_TIMEOUT
+            ))
+        except PoolError:
+            if pool.closed:
+                raise
+            return super().get_new_connection(conn_params)
+        self._pool = pool
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level
+        )
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+        psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x
+        )
+        return connection
+
+    def _close(self):
+        pool = getattr(self, '_pool', None)
+        if self.connection is None or pool is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            # Незавершённую транзакцию пул откатит сам.
+            pool.putconn(self.connection, close=bool(self.connection.closed))
+
+    def connect(self):
+        super().connect()
+        self.health_check_done = True
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        self.health_check_done = False
+
+    def close_if_health_check_failed(self):
+        if (
+            self.connection is None
+            or not self.health_check_enabled
+            or self.health_check_done
+        ):
+            return
+        if not self.is_usable():
+            self.close()
+        self.health_check_done = True
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
@@ -0,0 +1,44 @@
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+PRAGMA_TOKEN = re.compile(r'^-?\w+$')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite с PRAGMA и настраиваемым режимом начала транзакций.
+
+    PRAGMAS = {'journal_mode': 'wal', ...}: выполняются на каждом новом
+    соединении.
+
+    TRANSACTION_MODE = 'IMMEDIATE': atomic() сразу берёт блокировку
+    записи. Отложенная транзакция, которая сначала читает, а потом
+    пишет, в режиме WAL получает «database is locked» без ожидания
+    busy_timeout, если кто-то успел записать после её чтения.
+    """
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict.get('PRAGMAS', {}).items():
+            # PRAGMA не принимает параметры запроса — проверяем сами.
+            if not (
+                PRAGMA_TOKEN.match(name) and PRAGMA_TOKEN.match(str(value))
+            ):
+                connection.close()
+                raise ImproperlyConfigured(
+                    f'Недопустимая PRAGMA: {name}={value}'
+                )
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict.get('TRANSACTION_MODE')
+        if mode is None:
+            return super()._start_transaction_under_autocommit()
+        if mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f'TRANSACTION_MODE должен быть одним из {TRANSACTION_MODES}.'
+            )
+        self.cursor().execute(f'BEGIN {mode}')
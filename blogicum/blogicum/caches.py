@@ -0,0 +1,56 @@
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'memcached': 'django.core.cache.backends.memcached.PyMemcacheCache',
+    'redis': 'django_redis.cache.RedisCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def parse_option(value):
+    """Значение из строки запроса: true/false, целое, дробное или строка.
+
+    Клиенты pymemcache и django-redis ждут настоящие типы: строка 'false'
+    была бы для них истинной.
+    """
+    if value.lower() in ('true', 'false'):
+        return value.lower() == 'true'
+    for convert in (int, float):
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+    return value
+
+
+def cache_from_url(url):
+    """Настройки кэша из URL.
+
+    locmem:// — память процесса; memcached://host:11211[,host2:11211];
+    redis://host:6379/0 (нужен пакет django-redis); db://имя_таблицы
+    (таблицу создаёт manage.py createcachetable); dummy:// — без кэша.
+    Параметры строки запроса попадают в OPTIONS, см. parse_option().
+    """
+    parsed = urlsplit(url)
+    if parsed.scheme not in CACHE_BACKENDS:
+        raise ImproperlyConfigured(
+            f'Неподдерживаемая схема CACHE_URL: {parsed.scheme!r}.'
+        )
+    config = {'BACKEND': CACHE_BACKENDS[parsed.scheme]}
+    if parsed.scheme == 'memcached':
+        config['LOCATION'] = parsed.netloc.split(',')
+    elif parsed.scheme == 'redis':
+        config['LOCATION'] = url.split('?', 1)[0]
+    elif parsed.scheme == 'db':
+        config['LOCATION'] = unquote(parsed.netloc)
+    options = {
+        name: parse_option(value)
+        for name, value in parse_qsl(parsed.query)
+    }
+    if options:
+        config['OPTIONS'] = options
+    return config
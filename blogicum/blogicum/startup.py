@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.db import connections
+
+
+def startup():
+    """Подготовка процесса сервера после загрузки приложений.
+
+    Вызывается из wsgi.py и asgi.py: management-команды и тесты её
+    не выполняют.
+    """
+    from blog.jobs import drain_queue
+    from blog.urlformats import precompile
+
+    from .templates_warmup import warm_templates
+
+    precompile()
+    # Задачи, оставшиеся в очереди изображений после перезапуска.
+    drain_queue()
+    # Соединения из главного процесса не должны достаться процессам,
+    # которые сервер может создать форком.
+    connections.close_all()
+    if settings.TEMPLATE_WARMUP:
+        warm_templates()
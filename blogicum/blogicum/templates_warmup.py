@@ -0,0 +1,52 @@
+import logging
+from pathlib import Path
+
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+
+logger = logging.getLogger(__name__)
+
+
+def _source_loaders(loaders):
+    for loader in loaders:
+        if hasattr(loader, 'loaders'):
+            # Кэширующий загрузчик оборачивает загрузчики файлов.
+            yield from _source_loaders(loader.loaders)
+        elif hasattr(loader, 'get_dirs'):
+            yield loader
+
+
+def template_names(engine):
+    """Имена всех файлов во всех каталогах шаблонов движка."""
+    names = set()
+    for loader in _source_loaders(engine.engine.template_loaders):
+        for directory in loader.get_dirs():
+            directory = Path(directory)
+            names.update(
+                path.relative_to(directory).as_posix()
+                for path in directory.rglob('*') if path.is_file()
+            )
+    return sorted(names)
+
+
+def warm_templates():
+    """Компилирует все шаблоны, чтобы первый запрос не читал диск.
+
+    Имеет смысл с кэширующим загрузчиком: без него скомпилированные
+    шаблоны никто не сохранит. Возвращает число загруженных шаблонов.
+    """
+    loaded = 0
+    for engine in engines.all():
+        if not hasattr(engine, 'engine'):
+            continue
+        for name in template_names(engine):
+            try:
+                engine.get_template(name)
+            except (
+                TemplateDoesNotExist, TemplateSyntaxError, UnicodeDecodeError
+            ) as error:
+                # Посторонний файл в каталоге шаблонов не должен мешать
+                # серверу запуститься.
+                logger.warning('Шаблон %s не загружен: %s', name, error)
+            else:
+                loaded += 1
+    return loaded
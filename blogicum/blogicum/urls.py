@@ -1,9 +1,8 @@
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
-from blog import views
+from blog import media, views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -15,7 +14,12 @@ urlpatterns = [
         views.RegistrationCreateView.as_view(),
         name='registration'
     ),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path(
+        settings.MEDIA_URL.lstrip('/') + '<path:path>',
+        media.serve_media,
+        name='media'
+    ),
+]
 
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.internal_server_error'
@@ -41,6 +41,14 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -357,13 +365,11 @@ def cleanup(request):
 
     image_dir = Path(settings.__file__).parent.parent / settings.MEDIA_ROOT
 
-    for root, dirs, files in os.walk(image_dir):
+    for root, dirs, files in os.walk(image_dir, topdown=False):
         for filename in files:
-            if (
-                    filename.endswith(".jpg")
-                    or filename.endswith(".gif")
-                    or filename.endswith(".png")
-            ):
+            if filename.endswith((".jpg", ".gif", ".png", ".webp", ".avif")):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
                     os.remove(file_path)
+        if root != str(image_dir) and not os.listdir(root):
+            os.rmdir(root)
@@ -21,6 +21,14 @@ from conftest import (
 )
 
 
+@pytest.fixture
+def post(mixer: Mixer, user: Model, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True
+    )
+
+
 @pytest.fixture
 def posts_with_unpublished_category(mixer: Mixer, user: Model):
     return mixer.cycle(N_PER_FIXTURE).blend(
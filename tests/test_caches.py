@@ -0,0 +1,51 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+
+@pytest.mark.parametrize('url, expected', (
+    ('locmem://', {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }),
+    ('memcached://cache1:11211,cache2:11211', {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': ['cache1:11211', 'cache2:11211'],
+    }),
+    ('redis://cache:6379/1?socket_timeout=1.5&max_entries=100', {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': 'redis://cache:6379/1',
+        'OPTIONS': {'socket_timeout': 1.5, 'max_entries': 100},
+    }),
+    ('memcached://cache:11211?no_delay=true&ignore_exc=False', {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': ['cache:11211'],
+        'OPTIONS': {'no_delay': True, 'ignore_exc': False},
+    }),
+    ('db://blog_cache', {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'blog_cache',
+    }),
+))
+def test_cache_url(url, expected):
+    from blogicum.caches import cache_from_url
+
+    assert cache_from_url(url) == expected
+
+
+def test_unknown_cache_scheme_rejected():
+    from blogicum.caches import cache_from_url
+
+    with pytest.raises(ImproperlyConfigured):
+        cache_from_url('mongodb://localhost')
+
+
+def test_deploy_check_warns_about_process_cache(settings):
+    from blog.checks import check_shared_cache
+
+    assert [
+        warning.id for warning in check_shared_cache(None)
+    ] == ['blog.W001']
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': 'cache:11211',
+    }}
+    assert check_shared_cache(None) == []
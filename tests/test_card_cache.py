@@ -0,0 +1,120 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_card_rendered_once_across_feeds(user_client, post):
+    from blog.cache import get_stats
+
+    user_client.get('/')
+    user_client.get(f'/category/{post.category.slug}/')
+    user_client.get(f'/profile/{post.author.username}/')
+    assert get_stats('card') == {'hits': 2, 'misses': 1}, (
+        'Убедитесь, что карточка поста, общая для нескольких лент, '
+        'отрисовывается один раз и затем берётся из кэша.'
+    )
+
+
+@pytest.mark.parametrize('change', ('post', 'category', 'comment'))
+def test_card_cache_follows_changes(
+        user_client, mixer, user, post, change
+):
+    user_client.get('/')
+    if change == 'post':
+        post.title = 'Обновлённый заголовок'
+        post.save()
+        expected = 'Обновлённый заголовок'
+    elif change == 'category':
+        post.category.title = 'Обновлённая категория'
+        post.category.save()
+        expected = 'Обновлённая категория'
+    else:
+        mixer.blend('blog.Comment', post=post, author=user)
+        expected = 'Комментарии (1)'
+    assert expected in user_client.get('/').content.decode()
+
+
+def test_card_links_match_reverse(user_client, post):
+    from django.urls import reverse
+
+    content = user_client.get('/').content.decode()
+    for url in (
+        reverse('blog:post_detail', args=(post.pk,)),
+        reverse('blog:profile', args=(post.author.username,)),
+        reverse('blog:category_posts', args=(post.category.slug,)),
+    ):
+        assert f'href="{url}"' in content, (
+            'Убедитесь, что ссылки в карточке поста совпадают '
+            'с результатом reverse().'
+        )
+
+
+def test_feed_card_lookups_batched(
+        user_client, mixer, user, published_category
+):
+    from django.core.cache import caches
+
+    mixer.cycle(10).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True
+    )
+    backend = caches['default']
+    user_client.get('/')
+    calls, depth = [], []
+    for name in ('get', 'get_many', 'incr', 'add', 'set'):
+        method = getattr(backend, name)
+
+        # Вложенные вызовы (get_many в LocMemCache зовёт get) не считаются:
+        # у сетевого кэша это один запрос.
+        def counted(*args, _method=method, _name=name, **kwargs):
+            if not depth:
+                calls.append(_name)
+            depth.append(_name)
+            try:
+                return _method(*args, **kwargs)
+            finally:
+                depth.pop()
+
+        setattr(backend, name, counted)
+    try:
+        user_client.get('/')
+    finally:
+        for name in ('get', 'get_many', 'incr', 'add', 'set'):
+            delattr(backend, name)
+    assert calls.count('get_many') == 1
+    assert len(calls) < 10, (
+        'Убедитесь, что число обращений к кэшу за страницу ленты не растёт '
+        f'с числом карточек: {calls}.'
+    )
+
+
+def test_cache_stats_view_for_staff(
+        client, user_client, user, mixer, post
+):
+    from blog.cache import get_stats
+
+    client.get('/')
+    url = '/cache-stats/'
+    assert client.get(url).status_code == 302
+    assert user_client.get(url).status_code == 403
+    user.is_staff = True
+    user.save(update_fields=('is_staff',))
+    response = user_client.get(url)
+    assert response.status_code == 200
+    assert response.json() == {
+        'page': get_stats('page'), 'card': get_stats('card')
+    }
+    assert response.json()['page']['misses'] >= 1
+
+
+def test_bench_cards_rejects_stale_legacy_card(monkeypatch):
+    from django.core.management import CommandError, call_command
+
+    from blog.management.commands import bench_cards
+
+    call_command('bench_cards', '--sizes=1', '--repeat=1', stdout=None)
+    monkeypatch.setattr(
+        bench_cards, 'LEGACY_URLS', {'{{ missing_url }}': ''}
+    )
+    with pytest.raises(CommandError):
+        call_command('bench_cards', '--sizes=1', '--repeat=1', stdout=None)
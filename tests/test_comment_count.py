@@ -0,0 +1,121 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count(post):
+    post.refresh_from_db(fields=['comment_count'])
+    return post.comment_count
+
+
+def test_comment_count_follows_views(user_client, post):
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Первый'})
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Второй'})
+    assert _count(post) == 2, (
+        'Убедитесь, что при добавлении комментария увеличивается '
+        'счётчик комментариев поста.'
+    )
+    comment = post.comments.first()
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    assert _count(post) == 1, (
+        'Убедитесь, что при удалении комментария уменьшается '
+        'счётчик комментариев поста.'
+    )
+
+
+def test_comment_count_follows_cascade(mixer, post, another_user):
+    mixer.cycle(3).blend('blog.Comment', post=post, author=another_user)
+    assert _count(post) == 3
+    another_user.delete()
+    assert _count(post) == 0
+
+
+def test_recount_comments_repairs_drift(mixer, post, another_user):
+    from blog.models import Post
+
+    mixer.cycle(2).blend('blog.Comment', post=post, author=another_user)
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+    call_command('recount_comments')
+    assert _count(post) == 2
+
+
+@pytest.mark.parametrize('path', ('form', 'admin'))
+def test_post_edit_keeps_concurrent_comments(
+        mixer, post, admin_client, monkeypatch, path
+):
+    from blog.forms import PostForm
+    from blog.models import Post
+
+    stale = Post.objects.get(pk=post.pk)
+    data = {
+        'title': 'Исправленный заголовок', 'text': stale.text,
+        'category': stale.category_id, 'author': stale.author_id,
+        'pub_date': stale.pub_date.strftime('%Y-%m-%dT%H:%M'),
+        'pub_date_0': stale.pub_date.strftime('%Y-%m-%d'),
+        'pub_date_1': stale.pub_date.strftime('%H:%M:%S'),
+    }
+    if path == 'form':
+        form = PostForm(instance=stale, data=data)
+        assert form.is_valid(), form.errors
+        mixer.blend('blog.Comment', post=post, author=post.author)
+        form.save()
+    else:
+        from blog.admin import PostAdmin
+
+        save_model = PostAdmin.save_model
+
+        def save_after_comment(self, request, obj, form, change):
+            # Комментарий добавлен после того, как админка загрузила пост.
+            mixer.blend('blog.Comment', post=post, author=post.author)
+            save_model(self, request, obj, form, change)
+
+        monkeypatch.setattr(PostAdmin, 'save_model', save_after_comment)
+        response = admin_client.post(
+            f'/admin/blog/post/{post.pk}/change/', data
+        )
+        assert response.status_code == 302
+    assert _count(post) == 1, (
+        'Убедитесь, что правка поста не затирает счётчик '
+        'комментариев, изменившийся после загрузки поста.'
+    )
+    post.refresh_from_db()
+    assert post.title == 'Исправленный заголовок'
+
+
+def test_post_save_keeps_django_semantics(post):
+    from blog.models import Post
+
+    stale = Post.objects.get(pk=post.pk)
+    Post.objects.filter(pk=post.pk).delete()
+    stale.save()
+    assert Post.objects.filter(pk=post.pk).exists(), (
+        'Убедитесь, что save() удалённого поста создаёт его заново, '
+        'как обычно в Django.'
+    )
+
+
+def test_comment_count_follows_moved_comment(mixer, post, user):
+    another = mixer.blend(
+        'blog.Post', author=user, category=post.category
+    )
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    comment.post = another
+    comment.save()
+    assert (_count(post), _count(another)) == (0, 1), (
+        'Убедитесь, что перенос комментария к другому посту меняет '
+        'счётчики обоих постов.'
+    )
+    comment.text = 'Исправленный комментарий'
+    comment.save()
+    assert (_count(post), _count(another)) == (0, 1)
+
+
+def test_feed_does_not_join_comments(client, post):
+    with CaptureQueriesContext(connection) as queries:
+        client.get('/')
+    assert not any(
+        'blog_comment' in query['sql'] for query in queries.captured_queries
+    ), 'Лента не должна обращаться к таблице комментариев.'
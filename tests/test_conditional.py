@@ -0,0 +1,38 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(params=(
+    '/', '/category/{post.category.slug}/',
+    '/profile/{post.author.username}/', '/posts/{post.id}/',
+), ids=('index', 'category', 'profile', 'detail'))
+def url(request, post):
+    return request.param.format(post=post)
+
+
+def test_matching_etag_gets_304_without_queries(
+        client, url, django_assert_num_queries
+):
+    etag = client.get(url)['ETag']
+    with django_assert_num_queries(0):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304, (
+        'Убедитесь, что клиент с актуальной версией страницы получает 304.'
+    )
+    assert response['ETag'] == etag
+    assert not response.content
+
+
+def test_etag_changes_after_update(client, url, post):
+    etag = client.get(url)['ETag']
+    post.comments.create(author=post.author, text='Новый комментарий')
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+
+
+def test_etag_depends_on_reader(client, user_client, url):
+    assert client.get(url)['ETag'] != user_client.get(url)['ETag'], (
+        'Убедитесь, что разные читатели не получают чужую страницу.'
+    )
@@ -0,0 +1,113 @@
+import pytest
+from django.template import Context, Template
+from django.urls import NoReverseMatch, reverse, set_script_prefix
+
+pytestmark = [pytest.mark.django_db]
+
+CASES = (
+    ('blog:index', (), {}),
+    ('blog:post_detail', (1,), {}),
+    ('blog:post_detail', (), {'post_id': 42}),
+    ('blog:edit_post', (7,), {}),
+    ('blog:delete_post', (7,), {}),
+    ('blog:add_comment', (7,), {}),
+    ('blog:edit_comment', (7, 3), {}),
+    ('blog:delete_comment', (), {'post_id': 7, 'comment_id': 3}),
+    ('blog:category_posts', ('travel-notes',), {}),
+    ('blog:profile', ('user_1',), {}),
+    ('blog:edit_profile', (), {'username': 'user_1'}),
+    ('blog:search', (), {}),
+    ('pages:about', (), {}),
+)
+
+
+@pytest.mark.parametrize('viewname, args, kwargs', CASES)
+def test_fast_reverse_matches_reverse(viewname, args, kwargs):
+    from blog.urlformats import fast_reverse
+
+    assert fast_reverse(viewname, *args, **kwargs) == reverse(
+        viewname, args=args, kwargs=kwargs
+    ), f'Убедитесь, что fast_reverse() для {viewname} совпадает с reverse().'
+
+
+def test_fast_reverse_follows_script_prefix():
+    from blog.urlformats import fast_reverse
+
+    set_script_prefix('/blog/')
+    try:
+        assert fast_reverse('blog:post_detail', 1) == reverse(
+            'blog:post_detail', args=(1,)
+        ) == '/blog/posts/1/'
+    finally:
+        set_script_prefix('/')
+
+
+@pytest.mark.parametrize('viewname, args', (
+    ('blog:post_detail', ('not-a-number',)),
+    ('blog:post_detail', ()),
+    ('blog:missing', ()),
+))
+def test_fast_reverse_errors_match_reverse(viewname, args):
+    from blog.urlformats import fast_reverse
+
+    with pytest.raises(NoReverseMatch):
+        fast_reverse(viewname, *args)
+
+
+def test_precompile_covers_blog_urls():
+    from blog.urls import urlpatterns
+    from blog.urlformats import compile_url, precompile
+
+    compile_url.cache_clear()
+    assert precompile() == len(urlpatterns)
+    assert compile_url.cache_info().currsize == len(urlpatterns)
+
+
+def test_fast_url_tag_matches_url_tag():
+    context = Context({'post_id': 5, 'comment_id': 9})
+    fast = Template(
+        "{% load blog_tags %}"
+        "{% fast_url 'blog:edit_comment' post_id comment_id %}"
+    ).render(context)
+    assert fast == Template(
+        "{% url 'blog:edit_comment' post_id comment_id %}"
+    ).render(context)
+
+
+def test_get_absolute_url_matches_reverse(mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category
+    )
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    detail = reverse('blog:post_detail', args=(post.pk,))
+    assert post.get_absolute_url() == detail
+    assert comment.get_absolute_url() == f'{detail}#comment_{comment.pk}'
+    assert published_category.get_absolute_url() == reverse(
+        'blog:category_posts', args=(published_category.slug,)
+    )
+    assert user.get_absolute_url() == reverse(
+        'blog:profile', args=(user.username,)
+    ), (
+        'Убедитесь, что get_absolute_url() пользователя ведёт на его '
+        'профиль.'
+    )
+
+
+def test_detail_page_links_match_reverse(user_client, mixer, user):
+    post = mixer.blend('blog.Post', author=user)
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    content = user_client.get(
+        reverse('blog:post_detail', args=(post.pk,))
+    ).content.decode()
+    for viewname, args in (
+        ('blog:profile', (user.username,)),
+        ('blog:edit_post', (post.pk,)),
+        ('blog:delete_post', (post.pk,)),
+        ('blog:add_comment', (post.pk,)),
+        ('blog:edit_comment', (post.pk, comment.pk)),
+        ('blog:delete_comment', (post.pk, comment.pk)),
+    ):
+        url = reverse(viewname, args=args)
+        assert f'"{url}"' in content, (
+            f'Убедитесь, что на странице поста есть ссылка {url}.'
+        )
@@ -0,0 +1,95 @@
+import re
+
+import pytest
+from django.http import HttpResponse
+from django.template import RequestContext, Template
+from django.test import Client
+from django.urls import include, path
+from django.views import View
+
+from blog.mixins import PageCacheMixin
+
+pytestmark = [pytest.mark.django_db]
+
+CSRF_VALUE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+@pytest.mark.parametrize(
+    'url_template',
+    (
+        '/',
+        '/category/{post.category.slug}/',
+        '/profile/{post.author.username}/',
+        '/posts/{post.id}/',
+    ),
+    ids=('index', 'category', 'profile', 'detail'),
+)
+def test_anonymous_feed_served_from_cache(
+        client, post, url_template, django_assert_num_queries
+):
+    url = url_template.format(post=post)
+    first = client.get(url)
+    with django_assert_num_queries(0):
+        second = client.get(url)
+    assert second.content == first.content
+
+
+def test_feed_cache_invalidated_on_write(client, mixer, post):
+    client.get('/')
+    post.title = 'Новый заголовок поста'
+    post.save()
+    assert 'Новый заголовок поста' in client.get('/').content.decode(), (
+        'Убедитесь, что изменение поста сбрасывает кэш ленты.'
+    )
+
+
+def test_feed_cache_bypassed_for_users(user_client, post):
+    user_client.get('/')
+    response = user_client.get('/')
+    assert response.context is not None, (
+        'Страницы ленты для авторизованных пользователей не кэшируются.'
+    )
+
+
+def test_session_cookie_bypasses_cache(client, post):
+    client.get('/')
+    client.cookies['sessionid'] = 'stale-session'
+    assert client.get('/').context is not None, (
+        'Убедитесь, что при cookie сессии страница не берётся из кэша.'
+    )
+
+
+class CachedFormView(PageCacheMixin, View):
+    """Кэшируемая страница с формой: в самом блоге у анонима их нет."""
+
+    def get(self, request):
+        return HttpResponse(Template(
+            '<form method="post">{% csrf_token %}</form>'
+        ).render(RequestContext(request)))
+
+    def post(self, request):
+        return HttpResponse('Принято')
+
+
+urlpatterns = [
+    path('form/', CachedFormView.as_view()),
+    path('', include('blogicum.urls')),
+]
+
+
+def test_cached_page_gets_fresh_csrf_token(settings):
+    from blog.cache import get_stats
+
+    settings.ROOT_URLCONF = __name__
+    first = Client(enforce_csrf_checks=True).get('/form/')
+    client = Client(enforce_csrf_checks=True)
+    response = client.get('/form/')
+    assert get_stats('page')['hits'] == 1
+    token = CSRF_VALUE.search(response.content.decode())[1]
+    assert token not in first.content.decode(), (
+        'Убедитесь, что чужой CSRF-токен не попадает в кэш.'
+    )
+    response = client.post('/form/', {'csrfmiddlewaretoken': token})
+    assert response.status_code == 200, (
+        'Убедитесь, что форма со страницы из кэша проходит проверку CSRF.'
+    )
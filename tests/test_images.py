@@ -0,0 +1,472 @@
+import os
+from io import BytesIO
+
+import pytest
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_image(size=(2000, 1500), image_format='JPEG'):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'teal').save(buffer, image_format)
+    return SimpleUploadedFile(
+        'photo.jpg', buffer.getvalue(), content_type='image/jpeg'
+    )
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_WORKERS = {'BACKEND': 'sync'}
+    return tmp_path
+
+
+@pytest.fixture
+def post_with_image(
+        mixer, user, published_category, media_root,
+        django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        return mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            is_published=True, image=make_image()
+        )
+
+
+def test_renditions_created_on_upload(post_with_image):
+    from blog.renditions import RENDITIONS, rendition_name
+
+    storage = post_with_image.image.storage
+    for rendition, (width, height) in RENDITIONS.items():
+        name = rendition_name(post_with_image.image.name, rendition)
+        assert storage.exists(name), (
+            f'Убедитесь, что при загрузке создаётся копия «{rendition}».'
+        )
+        with storage.open(name) as file:
+            rendered = Image.open(file)
+            assert rendered.width <= width and rendered.height <= height
+
+
+def test_feed_and_detail_use_renditions(client, post_with_image):
+    from blog.renditions import rendition_name
+
+    name = post_with_image.image.name
+    card = client.get('/').content.decode()
+    assert rendition_name(name, 'card') in card
+    detail = client.get(f'/posts/{post_with_image.id}/').content.decode()
+    assert rendition_name(name, 'detail') in detail
+    assert post_with_image.image.url not in card + detail, (
+        'Убедитесь, что страницы ссылаются на копию без EXIF, '
+        'а не на оригинал.'
+    )
+
+
+def test_admin_preview_uses_thumbnail(post_with_image):
+    from blog.renditions import rendition_name
+
+    assert rendition_name(post_with_image.image.name, 'thumb') in (
+        post_with_image.image_tag()
+    )
+
+
+def test_image_job_tracks_status(post_with_image):
+    from blog.models import ImageJob
+
+    job = ImageJob.objects.get(post=post_with_image)
+    assert (job.status, job.attempts) == (ImageJob.DONE, 1)
+
+
+def test_failed_job_retried_then_marked_failed(
+        post_with_image, settings, monkeypatch
+):
+    from blog import jobs
+    from blog.models import ImageJob
+
+    def broken(field_file):
+        raise OSError('битый файл')
+
+    delays = []
+    settings.IMAGE_WORKERS = {
+        'BACKEND': 'sync', 'MAX_ATTEMPTS': 3, 'RETRY_DELAY': 5
+    }
+    monkeypatch.setattr(jobs, 'generate_renditions', broken)
+    monkeypatch.setattr(jobs.time, 'sleep', delays.append)
+    job = post_with_image.image_job
+    ImageJob.objects.filter(pk=job.pk).update(
+        status=ImageJob.PENDING, attempts=0
+    )
+    jobs.process_job(job.pk)
+    job.refresh_from_db()
+    assert (job.status, job.attempts) == (ImageJob.FAILED, 3)
+    assert 'битый файл' in job.last_error
+    assert delays == [5, 10], (
+        'Убедитесь, что повтор задачи откладывается, и пауза растёт '
+        'с каждой попыткой.'
+    )
+
+
+def test_worker_pool_usable_after_fork(settings):
+    from blog import jobs
+
+    settings.IMAGE_WORKERS = {'BACKEND': 'thread'}
+    # Пул с живыми потоками, как после drain_queue() в главном процессе.
+    jobs.get_executor().submit(int).result()
+    pid = os.fork()
+    if not pid:
+        try:
+            code = 0 if jobs.get_executor().submit(
+                int, '7'
+            ).result(timeout=5) == 7 else 1
+        except BaseException:
+            code = 1
+        os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0, (
+        'Убедитесь, что процесс, созданный форком, выполняет задачи '
+        'в собственном пуле.'
+    )
+
+
+@pytest.fixture
+def queued_post(
+        mixer, user, published_category, media_root, settings, monkeypatch,
+        django_capture_on_commit_callbacks
+):
+    """Пост, задача которого осталась в очереди, как после перезапуска."""
+    from blog import jobs
+
+    settings.IMAGE_WORKERS = {'BACKEND': 'thread'}
+    monkeypatch.setattr(jobs, 'submit', lambda job_id: None)
+    with django_capture_on_commit_callbacks(execute=True):
+        post = mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            is_published=True, image=make_image()
+        )
+    monkeypatch.undo()
+    settings.IMAGE_WORKERS = {'BACKEND': 'sync'}
+    return post
+
+
+@pytest.mark.parametrize('logged_in', (False, True))
+def test_card_refreshed_when_job_finishes(
+        client, user_client, queued_post, logged_in
+):
+    from blog import jobs
+    from blog.renditions import rendition_name
+
+    reader = user_client if logged_in else client
+    card = rendition_name(queued_post.image.name, 'card')
+    assert card not in reader.get('/').content.decode()
+    jobs.process_job(queued_post.image_job.pk)
+    assert card in reader.get('/').content.decode(), (
+        'Убедитесь, что после обработки изображения карточка и страница '
+        'ленты показывают уменьшенную копию.'
+    )
+
+
+def test_drain_queue_runs_pending_jobs(queued_post):
+    from blog import jobs
+    from blog.models import ImageJob
+
+    assert jobs.drain_queue() == 1
+    queued_post.image_job.refresh_from_db()
+    assert queued_post.image_job.status == ImageJob.DONE
+
+
+@pytest.mark.parametrize('attempts, expected', ((1, 'done'), (3, 'failed')))
+def test_stale_running_job_reclaimed(queued_post, attempts, expected):
+    from datetime import timedelta
+
+    from django.core.management import call_command
+    from django.utils import timezone
+
+    from blog.models import ImageJob
+
+    job = queued_post.image_job
+    ImageJob.objects.filter(pk=job.pk).update(
+        status=ImageJob.RUNNING,
+        attempts=attempts,
+        updated_at=timezone.now() - timedelta(hours=1),
+    )
+    call_command('process_image_jobs', stdout=None)
+    job.refresh_from_db()
+    assert job.status == expected, (
+        'Убедитесь, что задача, брошенная упавшим процессом, '
+        'возвращается в очередь.'
+    )
+
+
+def test_running_job_not_reclaimed_early(queued_post):
+    from blog import jobs
+    from blog.models import ImageJob
+
+    job = queued_post.image_job
+    ImageJob.objects.filter(pk=job.pk).update(status=ImageJob.RUNNING)
+    assert jobs.reclaim_stale_jobs() == 0
+
+
+def test_rebuild_command_regenerates(post_with_image):
+    from django.core.management import call_command
+
+    from blog.renditions import has_renditions, rendition_name
+
+    storage = post_with_image.image.storage
+    storage.delete(rendition_name(post_with_image.image.name, 'card'))
+    assert not has_renditions(post_with_image.image)
+    call_command('process_image_jobs', '--rebuild', stdout=None)
+    assert has_renditions(post_with_image.image)
+
+
+def test_modern_formats_offered_in_picture(client, post_with_image):
+    from blog.renditions import rendition_name, supported_formats
+
+    content = client.get('/').content.decode()
+    for _, extension, mime_type, _ in supported_formats():
+        name = rendition_name(post_with_image.image.name, 'card', extension)
+        url = post_with_image.image.storage.url(name)
+        assert f'<source type="{mime_type}" srcset="{url}">' in content, (
+            f'Убедитесь, что карточка предлагает копию в формате {mime_type}.'
+        )
+    card_url = post_with_image.image.storage.url(
+        rendition_name(post_with_image.image.name, 'card')
+    )
+    assert f'src="{card_url}"' in content
+
+
+def test_identical_uploads_share_one_file(
+        mixer, user, published_category, post_with_image
+):
+    other = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=make_image()
+    )
+    assert other.image.name == post_with_image.image.name, (
+        'Убедитесь, что одинаковые изображения сохраняются один раз.'
+    )
+    directory = os.path.dirname(other.image.name)
+    _, files = other.image.storage.listdir(directory)
+    originals = [name for name in files if name.count('.') == 1]
+    assert len(originals) == 1
+
+
+def test_hashed_image_cached_forever(client, post_with_image):
+    from blog.storage import file_digest
+
+    name = post_with_image.image.name
+    with post_with_image.image.open('rb') as file:
+        assert file_digest(file) in name
+    response = client.get(post_with_image.image.url)
+    assert 'immutable' in response['Cache-Control'], (
+        'Убедитесь, что изображение с хешем в имени кэшируется навсегда.'
+    )
+
+
+def test_collect_images_removes_orphans(post_with_image):
+    from django.core.files.base import ContentFile
+    from django.core.management import call_command
+
+    from blog.renditions import rendition_names
+
+    storage = post_with_image.image.storage
+    orphan = storage.save('images/orphan.jpg', ContentFile(b'orphan'))
+    call_command('collect_images', '--grace=0', stdout=None)
+    assert not storage.exists(orphan), (
+        'Убедитесь, что команда удаляет файлы без ссылок из постов.'
+    )
+    name = post_with_image.image.name
+    assert storage.exists(name)
+    assert all(storage.exists(rendition) for rendition in (
+        rendition_names(name)
+    ))
+
+
+@pytest.fixture
+def old_orphan(media_root):
+    """Файл без ссылок из постов, загруженный два часа назад."""
+    import time
+
+    from django.core.files.base import ContentFile
+
+    from blog.storage import post_image_storage as storage
+
+    name = storage.save('images/photo.jpg', ContentFile(b'orphan'))
+    old = time.time() - 2 * 60 * 60
+    os.utime(storage.path(name), (old, old))
+    return name
+
+
+def test_duplicate_upload_protects_orphan_from_collection(old_orphan):
+    from django.core.files.base import ContentFile
+    from django.core.management import call_command
+
+    from blog.storage import post_image_storage as storage
+
+    assert storage.save('images/again.jpg', ContentFile(b'orphan')) == (
+        old_orphan
+    )
+    call_command('collect_images', stdout=None)
+    assert storage.exists(old_orphan), (
+        'Убедитесь, что повторная загрузка того же файла защищает его '
+        'от удаления, пока пост ещё не сохранён.'
+    )
+
+
+@pytest.mark.parametrize('race', ('touch', 'save', 'reference'))
+def test_collection_loses_no_file_to_concurrent_upload(old_orphan, race):
+    from datetime import timedelta
+
+    from django.core.files.base import ContentFile
+    from django.utils import timezone
+
+    from blog.storage import post_image_storage as storage
+
+    def is_referenced(name):
+        # Загрузка того же файла, пока сборщик держит его переименованным.
+        if race == 'save':
+            assert storage.save(
+                'images/again.jpg', ContentFile(b'orphan')
+            ) == old_orphan
+        return race == 'reference'
+
+    if race == 'touch':
+        storage.touch(old_orphan)
+    cutoff = timezone.now() - timedelta(hours=1)
+    assert not storage.delete_unused(old_orphan, cutoff, is_referenced)
+    assert storage.exists(old_orphan)
+    assert not os.path.exists(storage.path(old_orphan) + '.collected')
+
+
+def test_collection_restores_file_when_check_fails(old_orphan):
+    from datetime import timedelta
+
+    from django.db import DatabaseError
+    from django.utils import timezone
+
+    from blog.storage import post_image_storage as storage
+
+    def is_referenced(name):
+        raise DatabaseError
+
+    cutoff = timezone.now() - timedelta(hours=1)
+    with pytest.raises(DatabaseError):
+        storage.delete_unused(old_orphan, cutoff, is_referenced)
+    assert storage.exists(old_orphan), (
+        'Убедитесь, что при ошибке проверки ссылок файл возвращается '
+        'на место.'
+    )
+    assert not os.path.exists(storage.path(old_orphan) + '.collected')
+
+
+def test_collect_images_skips_collected_files(old_orphan):
+    from django.core.management import call_command
+
+    from blog.storage import post_image_storage as storage
+
+    collected = storage.path(old_orphan) + '.collected'
+    os.rename(storage.path(old_orphan), collected)
+    call_command('collect_images', stdout=None)
+    assert os.path.exists(collected), (
+        'Убедитесь, что команда не удаляет файлы, которые другой запуск '
+        'держит под временным именем.'
+    )
+
+
+@pytest.fixture
+def post_form_data(published_category):
+    return {
+        'title': 'Фото',
+        'text': 'Текст',
+        'pub_date': '2020-01-01T00:00',
+        'category': published_category.id,
+        'is_published': True,
+    }
+
+
+def test_upload_streamed_and_hashed(
+        user_client, post_form_data, media_root, settings
+):
+    from blog.models import Post
+    from blog.storage import file_digest
+
+    settings.FILE_UPLOAD_TEMP_DIR = media_root / 'uploads'
+    image = make_image()
+    digest = file_digest(image)
+    image.seek(0)
+    user_client.post('/posts/create/', {**post_form_data, 'image': image})
+    post = Post.objects.get()
+    assert digest in post.image.name
+    assert not list((media_root / 'uploads').iterdir()), (
+        'Убедитесь, что временный файл переносится в хранилище.'
+    )
+
+
+@pytest.mark.parametrize(
+    'setting, value',
+    (('IMAGE_UPLOAD_MAX_SIZE', 1024), ('IMAGE_MAX_PIXELS', 1000)),
+    ids=('too_large', 'too_many_pixels'),
+)
+def test_oversized_upload_rejected(
+        user_client, post_form_data, media_root, settings, setting, value
+):
+    from blog.models import Post
+
+    setattr(settings, setting, value)
+    response = user_client.post(
+        '/posts/create/', {**post_form_data, 'image': make_image()}
+    )
+    assert response.status_code == 200
+    assert 'image' in response.context['form'].errors, (
+        'Убедитесь, что слишком большое изображение не принимается.'
+    )
+    assert not Post.objects.exists()
+    assert not (media_root / 'images').exists()
+
+
+def test_oversized_upload_rejected_in_admin(
+        admin_client, post_form_data, media_root, settings, mixer,
+        published_category
+):
+    post = mixer.blend(
+        'blog.Post', category=published_category, image=''
+    )
+    # Шум не сжимается: файл больше нескольких частей загрузки, и его
+    # обрезанная половина с целым заголовком проходит проверку Pillow.
+    buffer = BytesIO()
+    Image.frombytes('RGB', (500, 500), os.urandom(500 * 500 * 3)).save(
+        buffer, 'JPEG'
+    )
+    image = SimpleUploadedFile(
+        'noise.jpg', buffer.getvalue(), content_type='image/jpeg'
+    )
+    settings.IMAGE_UPLOAD_MAX_SIZE = image.size // 2
+    response = admin_client.post(f'/admin/blog/post/{post.id}/change/', {
+        **post_form_data,
+        'pub_date_0': '2020-01-01',
+        'pub_date_1': '00:00',
+        'author': post.author_id,
+        'image': image,
+    })
+    assert response.status_code == 200
+    assert 'image' in response.context['adminform'].form.errors, (
+        'Убедитесь, что в админке слишком большое изображение '
+        'не принимается.'
+    )
+    post.refresh_from_db()
+    assert not post.image
+    assert not (media_root / 'images').exists()
+
+
+def test_storage_refuses_truncated_upload(media_root):
+    from django.core.exceptions import SuspiciousFileOperation
+
+    from blog.storage import post_image_storage
+
+    image = make_image()
+    image.oversized = True
+    with pytest.raises(SuspiciousFileOperation):
+        post_image_storage.save('images/photo.jpg', image)
+    assert not (media_root / 'images').exists(), (
+        'Убедитесь, что хранилище не сохраняет обрезанную загрузку.'
+    )
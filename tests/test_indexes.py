@@ -0,0 +1,41 @@
+import pytest
+from django.db import connection
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _plan(queryset):
+    if connection.vendor == 'postgresql':
+        # На пустых таблицах планировщик PostgreSQL предпочтёт seq scan.
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+    elif connection.vendor != 'sqlite':
+        pytest.skip(f'План запроса для {connection.vendor} не проверяется.')
+    return queryset.explain()
+
+
+def _feed(queryset):
+    from blog.services import select_post_relations
+
+    return select_post_relations(queryset)
+
+
+def test_index_feed_uses_published_index():
+    from blog.models import Post
+
+    plan = _plan(_feed(Post.objects.published()))
+    assert 'post_published_pub_date_idx' in plan, plan
+
+
+def test_category_feed_uses_category_index(published_category):
+    plan = _plan(_feed(published_category.posts.published()))
+    assert 'post_category_pub_date_idx' in plan, plan
+
+
+@pytest.mark.parametrize('published', (True, False))
+def test_profile_feed_uses_author_index(user, published):
+    posts = user.posts.all()
+    if published:
+        posts = posts.published()
+    plan = _plan(_feed(posts))
+    assert 'post_author_pub_date_idx' in plan, plan
@@ -0,0 +1,94 @@
+import pytest
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def media_file(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    (tmp_path / 'images').mkdir()
+    (tmp_path / 'images' / 'photo.jpg').write_bytes(CONTENT)
+    return '/media/images/photo.jpg'
+
+
+def _body(response):
+    return b''.join(response.streaming_content)
+
+
+def test_full_response_has_validators(client, media_file):
+    response = client.get(media_file)
+    assert response.status_code == 200
+    assert _body(response) == CONTENT
+    assert response['ETag'].startswith('"')
+    assert response['Accept-Ranges'] == 'bytes'
+    assert 'immutable' not in response['Cache-Control']
+
+
+def test_conditional_requests_get_304(client, media_file):
+    response = client.get(media_file)
+    by_etag = client.get(media_file, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert by_etag.status_code == 304
+    by_date = client.get(
+        media_file, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    )
+    assert by_date.status_code == 304
+
+
+@pytest.mark.parametrize(
+    'header, start, end',
+    (
+        ('bytes=0-99', 0, 99),
+        ('bytes=10000-', 10000, len(CONTENT) - 1),
+        ('bytes=-16', len(CONTENT) - 16, len(CONTENT) - 1),
+    ),
+)
+def test_byte_ranges(client, media_file, header, start, end):
+    response = client.get(media_file, HTTP_RANGE=header)
+    assert response.status_code == 206
+    assert _body(response) == CONTENT[start:end + 1]
+    assert response['Content-Range'] == (
+        f'bytes {start}-{end}/{len(CONTENT)}'
+    )
+
+
+def test_unsatisfiable_range(client, media_file):
+    response = client.get(media_file, HTTP_RANGE='bytes=99999-')
+    assert response.status_code == 416
+    assert response['Content-Range'] == f'bytes */{len(CONTENT)}'
+
+
+def test_stale_if_range_returns_full_file(client, media_file):
+    response = client.get(
+        media_file, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"'
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('suffix, immutable', (
+    ('.jpg', True),
+    ('', True),
+    ('.card.jpg', False),
+    ('.detail.webp', False),
+))
+def test_only_hashed_originals_are_immutable(
+        client, settings, tmp_path, suffix, immutable
+):
+    settings.MEDIA_ROOT = tmp_path
+    name = 'ab' * 32 + suffix
+    (tmp_path / name).write_bytes(CONTENT)
+    response = client.get(f'/media/{name}')
+    assert ('immutable' in response['Cache-Control']) is immutable, (
+        'Убедитесь, что навсегда кэшируются только оригиналы с хешем '
+        'в имени, а не перезаписываемые копии.'
+    )
+
+
+def test_accel_redirect_handoff(client, settings, media_file):
+    settings.MEDIA_SENDFILE = 'x-accel-redirect'
+    response = client.get(media_file)
+    assert response['X-Accel-Redirect'] == '/protected-media/images/photo.jpg'
+    assert response.content == b''
+
+
+def test_path_traversal_is_404(client, media_file):
+    assert client.get('/media/../manage.py').status_code == 404
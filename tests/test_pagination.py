@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_posts(mixer, user, published_category):
+    start = timezone.now() - timedelta(days=1)
+    # Одинаковые даты у соседних постов проверяют разрешение ничьих по id.
+    pub_dates = (start - timedelta(hours=i // 2) for i in range(25))
+    return mixer.cycle(25).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=pub_dates
+    )
+
+
+def _expected_order(posts):
+    return [
+        post.id for post in
+        sorted(posts, key=lambda post: (post.pub_date, post.id), reverse=True)
+    ]
+
+
+@override_settings(FEED_PAGINATION='cursor')
+def test_cursor_pages_walk_forward_and_back(client, many_posts):
+    seen, cursors = [], []
+    response = client.get('/')
+    while True:
+        page = response.context['page_obj']
+        assert len(page) <= N_PER_PAGE
+        seen.extend(post.id for post in page)
+        if not page.has_next():
+            break
+        cursors.append(page.next_cursor)
+        response = client.get('/', {'cursor': page.next_cursor})
+    assert seen == _expected_order(many_posts), (
+        'Убедитесь, что курсорная пагинация отдаёт все посты ленты '
+        'в порядке убывания даты публикации без пропусков и повторов.'
+    )
+
+    page = response.context['page_obj']
+    response = client.get('/', {'cursor': page.previous_cursor})
+    previous_ids = [post.id for post in response.context['page_obj']]
+    assert previous_ids == seen[N_PER_PAGE:2 * N_PER_PAGE]
+
+
+@override_settings(FEED_PAGINATION='cursor')
+def test_deep_cursor_page_costs_as_first(
+        client, many_posts, django_assert_num_queries
+):
+    first = client.get('/').context['page_obj']
+    second = client.get('/', {'cursor': first.next_cursor})
+    with django_assert_num_queries(1):
+        client.get('/', {'cursor': second.context['page_obj'].next_cursor})
+
+
+def test_invalid_cursor_is_404(client, many_posts):
+    assert client.get('/', {'cursor': 'not-a-cursor'}).status_code == 404
+
+
+def _cursor(payload):
+    import base64
+    import json
+
+    return base64.urlsafe_b64encode(
+        json.dumps(payload).encode()
+    ).decode().rstrip('=')
+
+
+@override_settings(FEED_PAGINATION='cursor')
+@pytest.mark.parametrize('values', (
+    ['abc', 1],
+    [{'dt': '2020-01-01T00:00:00+00:00'}, 'abc'],
+    [{'dt': '2020-13-45T00:00:00'}, 1],
+    [{'dt': '2020-01-01T00:00:00+00:00'}, 10 ** 30],
+    [{'dt': '2020-01-01T00:00:00+00:00'}, None],
+    [{'dt': '2020-01-01T00:00:00+00:00'}, {'dt': 1}],
+    [None, 1],
+))
+def test_tampered_cursor_is_404(client, many_posts, values):
+    response = client.get('/', {'cursor': _cursor(['n', values])})
+    assert response.status_code == 404, (
+        'Убедитесь, что подделанный курсор страницы приводит к ошибке 404.'
+    )
+
+
+def test_offset_pagination_is_default(client, many_posts):
+    response = client.get('/', {'page': 2})
+    assert response.context['page_obj'].number == 2
@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_scheduled_post_appears_without_restart(
+        mixer, user, published_category, monkeypatch
+):
+    from blog import services
+    from blog.models import Post
+
+    pub_date = timezone.now() + timedelta(minutes=5)
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=pub_date
+    )
+    assert post not in Post.objects.published(), (
+        'Убедитесь, что отложенный пост не попадает в ленту до даты '
+        'публикации.'
+    )
+    monkeypatch.setattr(
+        services, 'now', lambda: pub_date + timedelta(minutes=2)
+    )
+    assert post in Post.objects.published(), (
+        'Убедитесь, что момент публикации вычисляется при каждом запросе, '
+        'а не при импорте модуля.'
+    )
+
+
+@override_settings(PUBLICATION_CUTOFF_GRANULARITY=60)
+def test_cutoff_is_rounded_to_granularity(monkeypatch):
+    from blog import services
+
+    moment = timezone.now().replace(second=42, microsecond=123)
+    monkeypatch.setattr(services, 'now', lambda: moment)
+    assert services.publication_cutoff() == moment.replace(
+        second=0, microsecond=0
+    )
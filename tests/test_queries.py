@@ -0,0 +1,90 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def post(post, mixer, user, published_location):
+    """Пост из fixtures/posts.py с местоположением и комментариями."""
+    post.location = published_location
+    post.save()
+    mixer.cycle(2).blend('blog.Comment', post=post, author=user)
+    return post
+
+
+@pytest.mark.parametrize(
+    'url_template, budget',
+    (
+        ('/', 2),
+        ('/category/{post.category.slug}/', 3),
+        ('/profile/{post.author.username}/', 3),
+    ),
+    ids=('index', 'category', 'profile'),
+)
+def test_feed_query_budget(
+        client, post, url_template, budget, django_assert_num_queries
+):
+    url = url_template.format(post=post)
+    with django_assert_num_queries(budget):
+        response = client.get(url)
+    assert response.status_code == 200
+
+
+def test_missing_category_resolves_once(client, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        response = client.get('/category/no-such-category/')
+    assert response.status_code == 404
+
+
+def test_post_detail_is_single_joined_fetch(
+        client, post, django_assert_num_queries
+):
+    # Пост со всеми связями, число комментариев и страница комментариев.
+    with django_assert_num_queries(3):
+        response = client.get(f'/posts/{post.id}/')
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize(
+    'url_template, budget',
+    (
+        # Форма поста ещё выбирает варианты категорий и местоположений.
+        ('/posts/{post.id}/edit/', 5),
+        ('/posts/{post.id}/delete/', 3),
+        ('/posts/{post.id}/edit_comment/{comment.id}/', 3),
+        ('/posts/{post.id}/delete_comment/{comment.id}/', 3),
+    ),
+    ids=('edit_post', 'delete_post', 'edit_comment', 'delete_comment'),
+)
+def test_author_check_shares_fetched_object(
+        user_client, post, url_template, budget, django_assert_num_queries
+):
+    url = url_template.format(post=post, comment=post.comments.first())
+    # Сессия, пользователь и один запрос редактируемого объекта.
+    with django_assert_num_queries(budget):
+        response = user_client.get(url)
+    assert response.status_code == 200
+
+
+def test_feed_loads_only_card_columns(client, post):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        client.get('/')
+    feed_sql = queries.captured_queries[-1]['sql']
+    for column in ('"blog_post"."text"', '"auth_user"."password"',
+                   '"blog_category"."description"'):
+        assert column not in feed_sql, (
+            f'Лента не должна загружать колонку {column}.'
+        )
+
+
+def test_excerpt_matches_truncatewords(mixer, user, published_category):
+    from django.template.defaultfilters import truncatewords
+
+    text = ' '.join(f'слово{i}' for i in range(30))
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category, text=text
+    )
+    assert post.excerpt == truncatewords(text, 10)
@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from django.test import override_settings
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture(scope='module')
+def replica_settings(django_db_setup, django_db_blocker, tmp_path_factory):
+    """Отдельный файл SQLite вместо реплики, отстающей от основной базы.
+
+    В реплику ничего не пишется, поэтому она пуста во всех тестах.
+    """
+    name = str(tmp_path_factory.mktemp('replica') / 'replica.sqlite3')
+    replica_settings = {
+        **connections['default'].settings_dict,
+        'NAME': name,
+        'TEST': {'NAME': name},
+    }
+    with override_settings(DATABASE_REPLICAS=['replica']):
+        with django_db_blocker.unblock(), replica_connection(
+            replica_settings
+        ):
+            call_command('migrate', database='replica', verbosity=0)
+    return replica_settings
+
+
+@contextmanager
+def replica_connection(replica_settings):
+    connections.settings['replica'] = replica_settings
+    try:
+        yield 'replica'
+    finally:
+        connections['replica'].close()
+        del connections.settings['replica']
+
+
+@pytest.fixture
+def replica(settings, replica_settings):
+    # Алиас появляется после подготовки теста: проверка доступа к базам
+    # pytest-django его не касается.
+    settings.DATABASE_REPLICAS = ['replica']
+    # Обработка изображения поста не должна менять ленту посреди теста.
+    settings.IMAGE_WORKERS = {'BACKEND': 'sync'}
+    with replica_connection(replica_settings) as alias:
+        yield alias
+
+
+@pytest.fixture
+def caught_up():
+    """Запись была давно: окно чтения из основной базы закрыто."""
+    from django.core.cache import cache
+
+    from blog.cache import RECENT_WRITE_KEY
+
+    cache.delete(RECENT_WRITE_KEY)
+
+
+def test_feed_and_detail_read_replica(client, replica, post, caught_up):
+    assert post.title not in client.get('/').content.decode(), (
+        'Убедитесь, что лента читает данные из реплики.'
+    )
+    assert client.get(f'/posts/{post.id}/').status_code == 404
+
+
+def test_write_views_use_primary(user_client, replica, post):
+    assert user_client.get(f'/posts/{post.id}/edit/').status_code == 200
+
+
+def test_client_pinned_to_primary_after_write(user_client, replica, post):
+    response = user_client.post(
+        f'/posts/{post.id}/comment/', {'text': 'Комментарий'}
+    )
+    assert 'pin_primary' in response.cookies, (
+        'Убедитесь, что после изменения данных клиент закрепляется '
+        'за основной базой.'
+    )
+    assert user_client.get(f'/posts/{post.id}/').status_code == 200, (
+        'Убедитесь, что автор сразу видит свои изменения.'
+    )
+
+
+def test_fresh_generation_not_cached_from_replica(client, replica, post):
+    first = client.get('/')
+    assert post.title in first.content.decode(), (
+        'Убедитесь, что сразу после изменения ленты страницы читают '
+        'основную базу: иначе в кэш попадёт устаревшая страница.'
+    )
+    etag = first['ETag']
+    assert client.get('/', HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+
+def test_session_user_read_from_primary(user_client, replica, caught_up):
+    response = user_client.get('/')
+    assert response.context['user'].is_authenticated, (
+        'Убедитесь, что сессия и пользователь читаются из основной базы.'
+    )
@@ -0,0 +1,75 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make_post(title, text='', is_published=True):
+        return mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            is_published=is_published, title=title, text=text or title
+        )
+    return make_post
+
+
+def _found(client, query, **params):
+    response = client.get('/search/', {'q': query, **params})
+    assert response.status_code == 200
+    return response, [post.id for post in response.context['page_obj']]
+
+
+def test_search_uses_stemming_and_ranks_title(client, make_post):
+    in_text = make_post('Заметка', 'Сегодня гуляли по осеннему парку.')
+    in_title = make_post('Осенние парки', 'Фотографии.')
+    make_post('Другое', 'Про зиму.')
+    _, found = _found(client, 'парк')
+    assert found == [in_title.id, in_text.id], (
+        'Убедитесь, что поиск учитывает словоформы и ставит совпадения '
+        'в заголовке выше совпадений в тексте.'
+    )
+
+
+def test_search_shows_only_published(client, make_post):
+    make_post('Черновик про парк', is_published=False)
+    _, found = _found(client, 'парк')
+    assert found == []
+
+
+def test_index_follows_post_changes(client, make_post):
+    post = make_post('Рецепт борща', 'Со сметаной.')
+    post.title = 'Рецепт солянки'
+    post.save()
+    assert _found(client, 'борщ')[1] == []
+    assert _found(client, 'солянка')[1] == [post.id]
+    post.delete()
+    assert _found(client, 'солянка')[1] == []
+
+
+def test_search_keyset_pagination(client, make_post):
+    posts = [make_post(f'Поход номер {number}') for number in range(15)]
+    response, first = _found(client, 'поход')
+    cursor = response.context['page_obj'].next_cursor
+    assert f'q=%D0%BF%D0%BE%D1%85%D0%BE%D0%B4&amp;cursor={cursor}' in (
+        response.content.decode()
+    )
+    _, second = _found(client, 'поход', cursor=cursor)
+    assert len(first) == 10
+    assert sorted(first + second) == sorted(post.id for post in posts)
+
+
+@pytest.mark.parametrize('query', ('', '!!!'))
+def test_empty_search(client, make_post, query):
+    make_post('Пост')
+    assert _found(client, query)[1] == []
+
+
+def test_search_tampered_cursor_is_404(client, make_post):
+    import base64
+    import json
+
+    make_post('Поход')
+    payload = json.dumps(['n', ['abc', 1]])
+    cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+    response = client.get('/search/', {'q': 'поход', 'cursor': cursor})
+    assert response.status_code == 404
@@ -0,0 +1,43 @@
+import importlib
+
+import pytest
+
+
+@pytest.fixture
+def reload_settings(monkeypatch):
+    import blogicum.settings
+
+    monkeypatch.delenv('DJANGO_ENV', raising=False)
+    monkeypatch.delenv('DJANGO_SECRET_KEY', raising=False)
+    monkeypatch.delenv('DJANGO_ALLOWED_HOSTS', raising=False)
+
+    def reload(**environment):
+        for name, value in environment.items():
+            monkeypatch.setenv(name, value)
+        return importlib.reload(blogicum.settings)
+
+    yield reload
+    monkeypatch.undo()
+    importlib.reload(blogicum.settings)
+
+
+def test_production_requires_secret_key(reload_settings):
+    from django.core.exceptions import ImproperlyConfigured
+
+    with pytest.raises(ImproperlyConfigured):
+        reload_settings(DJANGO_ENV='production')
+    settings = reload_settings(DJANGO_SECRET_KEY='secret')
+    assert settings.SECRET_KEY == 'secret'
+
+
+def test_development_falls_back_to_insecure_key(reload_settings):
+    assert reload_settings().SECRET_KEY.startswith('django-insecure-')
+
+
+def test_allowed_hosts_from_environment(reload_settings):
+    settings = reload_settings(
+        DJANGO_ALLOWED_HOSTS='blog.example.com,www.blog.example.com'
+    )
+    assert settings.ALLOWED_HOSTS == [
+        'blog.example.com', 'www.blog.example.com'
+    ]
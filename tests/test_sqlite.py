@@ -0,0 +1,94 @@
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='Проверяются настройки SQLite.'
+    ),
+]
+
+
+@pytest.fixture
+def tuned_wrapper(tmp_path, django_db_blocker):
+    """Отдельное соединение с файловой базой в рабочем режиме."""
+    from blogicum.backends.sqlite3.base import DatabaseWrapper
+    from blogicum.database import database_from_url
+
+    wrapper = DatabaseWrapper({
+        **connection.settings_dict,
+        **database_from_url(
+            f'sqlite:///{tmp_path / "tuned.sqlite3"}', sqlite_tuning=True
+        ),
+    }, alias='tuned')
+    with django_db_blocker.unblock():
+        yield wrapper
+        wrapper.close()
+
+
+def _pragma(wrapper, name):
+    with wrapper.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+def test_pragmas_applied_on_connect(tuned_wrapper):
+    from blogicum.database import SQLITE_TUNED_PRAGMAS
+
+    assert _pragma(tuned_wrapper, 'journal_mode') == 'wal', (
+        'Убедитесь, что в рабочем режиме SQLite включается журнал WAL.'
+    )
+    for name in ('busy_timeout', 'cache_size', 'mmap_size'):
+        assert _pragma(tuned_wrapper, name) == SQLITE_TUNED_PRAGMAS[name]
+    # NORMAL = 1, MEMORY = 2.
+    assert (
+        _pragma(tuned_wrapper, 'synchronous'),
+        _pragma(tuned_wrapper, 'temp_store'),
+    ) == (1, 2)
+
+
+def test_invalid_pragma_rejected(tuned_wrapper):
+    from django.core.exceptions import ImproperlyConfigured
+
+    tuned_wrapper.settings_dict['PRAGMAS'] = {
+        'journal_mode': 'wal; DROP TABLE blog_post'
+    }
+    with pytest.raises(ImproperlyConfigured):
+        tuned_wrapper.ensure_connection()
+
+
+@pytest.mark.parametrize('environment, tuned', (
+    ({}, False),
+    ({'DJANGO_ENV': 'production'}, True),
+    ({'DJANGO_ENV': 'production', 'DATABASE_SQLITE_TUNING': '0'}, False),
+    ({'DATABASE_SQLITE_TUNING': '1'}, True),
+))
+def test_tuning_enabled_in_production_only(monkeypatch, environment, tuned):
+    import importlib
+
+    import blogicum.settings
+
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    monkeypatch.delenv('DJANGO_ENV', raising=False)
+    monkeypatch.delenv('DATABASE_SQLITE_TUNING', raising=False)
+    monkeypatch.setenv('DJANGO_SECRET_KEY', 'test')
+    for name, value in environment.items():
+        monkeypatch.setenv(name, value)
+    try:
+        module = importlib.reload(blogicum.settings)
+        assert ('PRAGMAS' in module.DATABASES['default']) is tuned
+    finally:
+        monkeypatch.undo()
+        importlib.reload(blogicum.settings)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_atomic_takes_write_lock_immediately():
+    from blog.models import Post
+
+    with CaptureQueriesContext(connection) as queries:
+        with transaction.atomic():
+            Post.objects.exists()
+    assert queries.captured_queries[0]['sql'] == 'BEGIN IMMEDIATE', (
+        'Убедитесь, что транзакции SQLite начинаются с BEGIN IMMEDIATE.'
+    )
@@ -0,0 +1,49 @@
+import pytest
+from django.template import engines
+
+
+@pytest.fixture
+def cached_templates(settings):
+    settings.TEMPLATES = [{
+        **settings.TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **settings.TEMPLATES[0]['OPTIONS'],
+            'loaders': [('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ])],
+        },
+    }]
+    return engines['django'].engine.template_loaders[0]
+
+
+def test_warmup_compiles_every_project_template(settings, cached_templates):
+    from blogicum.templates_warmup import warm_templates
+
+    assert warm_templates() > 0
+    cached = set(cached_templates.get_template_cache)
+    project = {
+        path.relative_to(settings.TEMPLATES_DIR).as_posix()
+        for path in settings.TEMPLATES_DIR.rglob('*') if path.is_file()
+    }
+    assert project <= cached, (
+        'Убедитесь, что прогрев компилирует все шаблоны из templates/.'
+    )
+    assert 'django_bootstrap5/form_errors.html' in cached
+
+
+def test_warmup_skips_undecodable_files(settings, tmp_path):
+    from blogicum.templates_warmup import warm_templates
+
+    (tmp_path / 'broken.html').write_bytes(b'\xff\xfe\xfa')
+    (tmp_path / 'fine.html').write_text('{{ title }}')
+    settings.TEMPLATES = [{
+        **settings.TEMPLATES[0],
+        'DIRS': [tmp_path],
+        'APP_DIRS': False,
+    }]
+    assert warm_templates() == 1, (
+        'Убедитесь, что файл не в UTF-8 в каталоге шаблонов не мешает '
+        'запуску сервера.'
+    )